@@ -1,108 +1,198 @@
 from flask import request, jsonify
-from ..poker.card import Card
+from ..poker.card import CARDS_BY_INDEX, RANKS, card_from_str, cards_to_mask, mask_to_cards
 from ..poker.evaluator import HandEvaluator
-from ..poker.equity import EquityCalculator
+from ..poker.equity import EquityCalculator, _expand_range, canonical_composition, is_suit_blind
 from ..poker.strategy import PreflopStrategy
 from ..poker.range_filter import filter_range_for_board, partition_range
-import random
+import numpy as np
+from functools import lru_cache
 
-def validate_no_duplicate_cards(hero_hand, board):
-    """Check for duplicate cards between hero hand and board"""
-    all_cards = hero_hand + board
-    card_strings = [f"{card.rank}{card.suit}" for card in all_cards]
+# opponent ranges by tightness, built once at import. tuples so they can go
+# straight into the equity cache key without being converted on every request
+
+# ~40% of hands: loose range
+WIDE_OPPONENT_RANGE = (
+    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
+    'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
+    'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s',
+    'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s',
+    'JTs', 'J9s', 'J8s', 'J7s',
+    'T9s', 'T8s', 'T7s',
+    '98s', '97s',
+    '87s', '86s',
+    '76s', '75s',
+    '65s', '54s',
+    'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o',
+    'KQo', 'KJo', 'KTo', 'K9o', 'K8o',
+    'QJo', 'QTo', 'Q9o',
+    'JTo', 'J9o',
+    'T9o'
+)
+
+# ~25% of hands: standard range
+MEDIUM_OPPONENT_RANGE = (
+    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
+    'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
+    'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s',
+    'QJs', 'QTs', 'Q9s', 'Q8s',
+    'JTs', 'J9s', 'J8s',
+    'T9s', 'T8s',
+    '98s', '97s',
+    '87s',
+    '76s',
+    'AKo', 'AQo', 'AJo', 'ATo', 'A9o',
+    'KQo', 'KJo', 'KTo',
+    'QJo'
+)
+
+# ~15% of hands: tight range
+TIGHT_OPPONENT_RANGE = (
+    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55',
+    'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s',
+    'KQs', 'KJs', 'KTs', 'K9s',
+    'QJs', 'QTs',
+    'JTs',
+    'T9s',
+    '98s',
+    'AKo', 'AQo', 'AJo', 'ATo',
+    'KQo'
+)
+
+# /calculate_equity's fallback when no villain range is sent
+DEFAULT_VILLAIN_RANGE = (
+    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
+    'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
+    'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o', 'A4o', 'A3o', 'A2o',
+    'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s', 'K3s', 'K2s',
+    'KQo', 'KJo', 'KTo', 'K9o', 'K8o', 'K7o', 'K6o', 'K5o', 'K4o', 'K3o', 'K2o',
+    'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s', 'Q5s', 'Q4s', 'Q3s', 'Q2s',
+    'QJo', 'QTo', 'Q9o', 'Q8o', 'Q7o', 'Q6o', 'Q5o', 'Q4o', 'Q3o', 'Q2o',
+    'JTs', 'J9s', 'J8s', 'J7s', 'J6s', 'J5s', 'J4s', 'J3s', 'J2s',
+    'JTo', 'J9o', 'J8o', 'J7o', 'J6o', 'J5o', 'J4o', 'J3o', 'J2o',
+    'T9s', 'T8s', 'T7s', 'T6s', 'T5s', 'T4s', 'T3s', 'T2s',
+    'T9o', 'T8o', 'T7o', 'T6o', 'T5o', 'T4o', 'T3o', 'T2o',
+    '98s', '97s', '96s', '95s', '94s', '93s', '92s',
+    '98o', '97o', '96o', '95o', '94o', '93o', '92o',
+    '87s', '86s', '85s', '84s', '83s', '82s',
+    '87o', '86o', '85o', '84o', '83o', '82o',
+    '76s', '75s', '74s', '73s', '72s',
+    '76o', '75o', '74o', '73o', '72o',
+    '65s', '64s', '63s', '62s',
+    '65o', '64o', '63o', '62o',
+    '54s', '53s', '52s',
+    '54o', '53o', '52o',
+    '43s', '42s',
+    '43o', '42o',
+    '32s', '32o'
+)
+
+OPPONENT_RANGES = {
+    "wide": WIDE_OPPONENT_RANGE,
+    "medium": MEDIUM_OPPONENT_RANGE,
+    "tight": TIGHT_OPPONENT_RANGE,
+}
+
+# postflop recommendation per best-hand type. hands in the first table always
+# act that way; the rest call when the pot odds are under their cutoff (anything
+# not listed - high card - uses the last one) and fold otherwise
+MADE_HAND_RECOMMENDATIONS = {
+    'royal_flush': 'BET/RAISE', 'straight_flush': 'BET/RAISE', 'four_kind': 'BET/RAISE',
+    'full_house': 'BET/RAISE', 'flush': 'BET/RAISE', 'straight': 'BET/RAISE', 'three_kind': 'BET/RAISE',
+    'two_pair': 'BET/CALL',
+}
+CALL_POT_ODDS_BY_HAND_TYPE = {'pair': 0.3}
+HIGH_CARD_CALL_POT_ODDS = 0.2
+
+# /calculate_equity stops once the 95% confidence interval on the equity is
+# within +/- this much (simulations is then just the most it will run).
+# clients can send their own 'tolerance', or null to always run every simulation
+DEFAULT_EQUITY_TOLERANCE = 0.01
+
+# most spots /calculate_equity_batch takes in one request
+MAX_EQUITY_BATCH = 100
+
+# bet-to-pot cutoffs per seat: wide range below the first, medium below the second,
+# tight otherwise. anything that isn't SB plays like BB
+RANGE_TIER_CUTOFFS = {
+    "SB": (0.5, 1.0),  # against sb, bb defends wider
+    "BB": (0.3, 0.8),  # against bb, sb can be more aggressive
+}
+
+def validate_no_duplicate_cards(hero_hand, board) -> int:
+    """Check for duplicate cards between hero hand and board (returns the mask of all of them)"""
+    # each card is one bit, so a card we've already seen is a single AND
+    seen = 0
+    duplicates = set()
+    for card in hero_hand + board:
+        if seen & card.mask:
+            duplicates.add(str(card))
+        seen |= card.mask
     
-    if len(card_strings) != len(set(card_strings)):
-        # find the duplicates
-        seen = set()
-        duplicates = set()
-        for card_str in card_strings:
-            if card_str in seen:
-                duplicates.add(card_str)
-            seen.add(card_str)
+    if duplicates:
         raise ValueError(f"Duplicate cards detected: {', '.join(duplicates)}")
+    return seen
 
-def get_dynamic_opponent_range(position, pot_size, current_bet, board):
-    """Get a dynamic opponent range based on betting action and board texture"""
-    
-    # figure out how big the bet is to see how tight their range should be
+@lru_cache(maxsize=1024)
+def bet_ratios(pot_size, current_bet):
+    """All the bet sizing math in one place: (pot odds, bet-to-pot ratio)"""
+    # bet sizes bunch up around a few common ones (half pot, pot, ...) and one
+    # analyze_hand asks twice, so remember them
+    pot_odds = current_bet / (pot_size + current_bet) if (pot_size + current_bet) > 0 else 0
     bet_to_pot_ratio = current_bet / max(pot_size, 1) if pot_size > 0 else 0
+    return pot_odds, bet_to_pot_ratio
+
+def get_opponent_range_type(position, pot_size, current_bet):
+    """How tight the opponent's range is ("wide", "medium" or "tight") given the betting"""
     
-    # different positions have different ranges
-    if position == "SB":
-        # against sb, bb defends wider
-        if bet_to_pot_ratio < 0.5:  # small bet/limp
-            range_type = "wide"
-        elif bet_to_pot_ratio < 1.0:  # medium bet
-            range_type = "medium"
-        else:  # large bet
-            range_type = "tight"
-    else:  # BB
-        # against bb, sb can be more aggressive
-        if bet_to_pot_ratio < 0.3:
-            range_type = "wide"
-        elif bet_to_pot_ratio < 0.8:
-            range_type = "medium"
-        else:
-            range_type = "tight"
+    # figure out how big the bet is to see how tight their range should be
+    _, bet_to_pot_ratio = bet_ratios(pot_size, current_bet)
     
-    # pick the range based on tightness
-    if range_type == "wide":
-        # ~40% of hands: loose range
-        return [
-            'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
-            'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
-            'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s',
-            'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s',
-            'JTs', 'J9s', 'J8s', 'J7s',
-            'T9s', 'T8s', 'T7s',
-            '98s', '97s',
-            '87s', '86s',
-            '76s', '75s',
-            '65s', '54s',
-            'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o',
-            'KQo', 'KJo', 'KTo', 'K9o', 'K8o',
-            'QJo', 'QTo', 'Q9o',
-            'JTo', 'J9o',
-            'T9o'
-        ]
-    elif range_type == "medium":
-        # ~25% of hands: standard range
-        return [
-            'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
-            'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
-            'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s',
-            'QJs', 'QTs', 'Q9s', 'Q8s',
-            'JTs', 'J9s', 'J8s',
-            'T9s', 'T8s',
-            '98s', '97s',
-            '87s',
-            '76s',
-            'AKo', 'AQo', 'AJo', 'ATo', 'A9o',
-            'KQo', 'KJo', 'KTo',
-            'QJo'
-        ]
-    else:  # tight
-        # ~15% of hands: tight range
-        return [
-            'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55',
-            'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s',
-            'KQs', 'KJs', 'KTs', 'K9s',
-            'QJs', 'QTs',
-            'JTs',
-            'T9s',
-            '98s',
-            'AKo', 'AQo', 'AJo', 'ATo',
-            'KQo'
-        ]
+    # different positions have different ranges - the seat just picks the cutoffs
+    wide_below, medium_below = RANGE_TIER_CUTOFFS.get(position, RANGE_TIER_CUTOFFS["BB"])
+    if bet_to_pot_ratio < wide_below:  # small bet/limp
+        return "wide"
+    elif bet_to_pot_ratio < medium_below:  # medium bet
+        return "medium"
+    else:  # large bet
+        return "tight"
+
+def _cached_equity(hero_mask, board_mask, range_type, simulations):
+    """Monte Carlo equity memoized by deck composition (hero cards, board cards, range tier)"""
+    equity, _ = _cached_range_equity(hero_mask, OPPONENT_RANGES[range_type], board_mask, simulations)
+    return equity
+
+def _cached_range_equity(hero_mask, villain_range, board_mask, simulations, tol=None):
+    """(equity, runs used) memoized on (hero cards, range tuple, board cards, simulations, tol)"""
+    # dealer caching: with a suit-blind range the answer only depends on the card
+    # composition up to renaming suits, so every suit-swapped spot shares one entry
+    if is_suit_blind(villain_range):
+        hero_mask, board_mask = canonical_composition(hero_mask, board_mask)
+    return _equity_by_composition(hero_mask, villain_range, board_mask, simulations, tol)
+
+@lru_cache(maxsize=65536)
+def _equity_by_composition(hero_mask, villain_range, board_mask, simulations, tol):
+    """the cached part of _cached_range_equity"""
+    # masks don't care about card order, so AsKd and KdAs share a cache entry
+    hero_hand = mask_to_cards(hero_mask)
+    board = mask_to_cards(board_mask)
+    return equity_calculator.calculate_equity_with_runs(hero_hand, villain_range, board, simulations, tol=tol)
+
+@lru_cache(maxsize=65536)
+def _best_hand_type(cards_mask):
+    """Best hand type for a set of cards, remembered per mask: clients re-asking about
+    the same hand and board (while deciding what to do) get the same answer back"""
+    return hand_evaluator._best_hand_of(mask_to_cards(cards_mask)).hand_type
 
 def calculate_dynamic_hand_strength(hero_hand, board, position, pot_size, current_bet):
     """Calculate hand strength against a dynamic opponent range"""
     try:
-        # get the opponent's range based on their betting
-        opponent_range = get_dynamic_opponent_range(position, pot_size, current_bet, board)
+        # get how tight the opponent's range is based on their betting
+        range_type = get_opponent_range_type(position, pot_size, current_bet)
         
-        # use equity calculator to get win rate against this range
-        equity = equity_calculator.calculate_equity(hero_hand, opponent_range, board, simulations=500)
+        # use equity calculator to get win rate against this range. the bet size and
+        # position only matter through the range tier, so every spot that lands on
+        # the same tier shares one simulation (same cards + same tier = cache hit)
+        equity = _cached_equity(cards_to_mask(hero_hand), cards_to_mask(board), range_type, 500)
         
         # convert equity (0.0-1.0) to percentage (0-100)
         return round(equity * 100, 1)
@@ -111,72 +201,106 @@ def calculate_dynamic_hand_strength(hero_hand, board, position, pot_size, curren
         # fallback to percentile calculation
         return calculate_hand_percentile(hero_hand)
 
+# all possible starting hands (169 total), best first
+ALL_HANDS = (
+    # pairs (13 hands)
+    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
+    # suited hands (78 hands)
+    'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
+    'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s', 'K3s', 'K2s',
+    'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s', 'Q5s', 'Q4s', 'Q3s', 'Q2s',
+    'JTs', 'J9s', 'J8s', 'J7s', 'J6s', 'J5s', 'J4s', 'J3s', 'J2s',
+    'T9s', 'T8s', 'T7s', 'T6s', 'T5s', 'T4s', 'T3s', 'T2s',
+    '98s', '97s', '96s', '95s', '94s', '93s', '92s',
+    '87s', '86s', '85s', '84s', '83s', '82s',
+    '76s', '75s', '74s', '73s', '72s',
+    '65s', '64s', '63s', '62s',
+    '54s', '53s', '52s',
+    '43s', '42s',
+    '32s',
+    # offsuit hands (78 hands)
+    'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o', 'A4o', 'A3o', 'A2o',
+    'KQo', 'KJo', 'KTo', 'K9o', 'K8o', 'K7o', 'K6o', 'K5o', 'K4o', 'K3o', 'K2o',
+    'QJo', 'QTo', 'Q9o', 'Q8o', 'Q7o', 'Q6o', 'Q5o', 'Q4o', 'Q3o', 'Q2o',
+    'JTo', 'J9o', 'J8o', 'J7o', 'J6o', 'J5o', 'J4o', 'J3o', 'J2o',
+    'T9o', 'T8o', 'T7o', 'T6o', 'T5o', 'T4o', 'T3o', 'T2o',
+    '98o', '97o', '96o', '95o', '94o', '93o', '92o',
+    '87o', '86o', '85o', '84o', '83o', '82o',
+    '76o', '74o', '73o', '72o',
+    '65o', '64o', '63o', '62o',
+    '54o', '53o', '52o',
+    '43o', '42o',
+    '32o'
+)
+
+# where each hand sits in ALL_HANDS (0 = best), read once to build the percentile table
+HAND_RANK = {hand: position for position, hand in enumerate(ALL_HANDS)}
+
+def _build_percentile_table():
+    """13x13 grid of preflop percentiles, filled once from ALL_HANDS
+    
+    indexed by rank index (0 = deuce): pairs on the diagonal, suited hands at
+    [high, low], offsuit hands at [low, high]. anything not listed stays 0
+    """
+    table = np.zeros((13, 13))
+    for hand, position in HAND_RANK.items():
+        high, low = RANKS.index(hand[0]), RANKS.index(hand[1])
+        # convert to percentile (0-100)
+        percentile = round(((len(ALL_HANDS) - position - 1) / (len(ALL_HANDS) - 1)) * 100, 1)
+        if hand.endswith('o'):
+            table[low, high] = percentile
+        else:
+            table[high, low] = percentile
+    table.flags.writeable = False
+    return table
+
+PREFLOP_PERCENTILE_TABLE = _build_percentile_table()
+
+def _build_percentile_by_index():
+    """the 13x13 grid spread out to every pair of card indexes (52x52), so a hand's
+    percentile is one lookup on its two card indexes. nested tuples of python
+    floats, since that's what callers return"""
+    table = [[0.0] * 52 for _ in range(52)]
+    for card1 in CARDS_BY_INDEX:
+        for card2 in CARDS_BY_INDEX:
+            # pairs/suited at [high, low], offsuit at [low, high]
+            high, low = max(card1.value, card2.value) - 2, min(card1.value, card2.value) - 2
+            if card1.suit == card2.suit or high == low:
+                table[card1.index][card2.index] = float(PREFLOP_PERCENTILE_TABLE[high, low])
+            else:
+                table[card1.index][card2.index] = float(PREFLOP_PERCENTILE_TABLE[low, high])
+    return tuple(tuple(row) for row in table)
+
+PREFLOP_PERCENTILE_BY_INDEX = _build_percentile_by_index()
+
 def calculate_hand_percentile(hero_hand):
     """Calculate hand strength as percentile (0-100) based on all possible hands"""
     if len(hero_hand) != 2:
         return 0.0
     
-    # all possible starting hands (169 total)
-    all_hands = [
-        # pairs (13 hands)
-        'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
-        # suited hands (78 hands)
-        'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
-        'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s', 'K3s', 'K2s',
-        'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s', 'Q5s', 'Q4s', 'Q3s', 'Q2s',
-        'JTs', 'J9s', 'J8s', 'J7s', 'J6s', 'J5s', 'J4s', 'J3s', 'J2s',
-        'T9s', 'T8s', 'T7s', 'T6s', 'T5s', 'T4s', 'T3s', 'T2s',
-        '98s', '97s', '96s', '95s', '94s', '93s', '92s',
-        '87s', '86s', '85s', '84s', '83s', '82s',
-        '76s', '75s', '74s', '73s', '72s',
-        '65s', '64s', '63s', '62s',
-        '54s', '53s', '52s',
-        '43s', '42s',
-        '32s',
-        # offsuit hands (78 hands)
-        'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o', 'A4o', 'A3o', 'A2o',
-        'KQo', 'KJo', 'KTo', 'K9o', 'K8o', 'K7o', 'K6o', 'K5o', 'K4o', 'K3o', 'K2o',
-        'QJo', 'QTo', 'Q9o', 'Q8o', 'Q7o', 'Q6o', 'Q5o', 'Q4o', 'Q3o', 'Q2o',
-        'JTo', 'J9o', 'J8o', 'J7o', 'J6o', 'J5o', 'J4o', 'J3o', 'J2o',
-        'T9o', 'T8o', 'T7o', 'T6o', 'T5o', 'T4o', 'T3o', 'T2o',
-        '98o', '97o', '96o', '95o', '94o', '93o', '92o',
-        '87o', '86o', '85o', '84o', '83o', '82o',
-        '76o', '74o', '73o', '72o',
-        '65o', '64o', '63o', '62o',
-        '54o', '53o', '52o',
-        '43o', '42o',
-        '32o'
-    ]
-    
-    # turn the hero hand into AKs notation
+    # straight table read on the card indexes: no ranks, suits or notation strings
     card1, card2 = hero_hand
-    if card1.value == card2.value:
-        hand_notation = f"{card1.rank}{card2.rank}"
-    elif card1.suit == card2.suit:
-        if card1.value > card2.value:
-            hand_notation = f"{card1.rank}{card2.rank}s"
-        else:
-            hand_notation = f"{card2.rank}{card1.rank}s"
-    else:
-        if card1.value > card2.value:
-            hand_notation = f"{card1.rank}{card2.rank}o"
-        else:
-            hand_notation = f"{card2.rank}{card1.rank}o"
+    return PREFLOP_PERCENTILE_BY_INDEX[card1.index][card2.index]
+
+@lru_cache(maxsize=8192)
+def _preflop_action(position, index1, index2):
+    """The dynamic preflop action for a seat and two card indexes
     
-    # find where this hand ranks
-    try:
-        position = all_hands.index(hand_notation)
-        # convert to percentile (0-100)
-        percentile = ((len(all_hands) - position - 1) / (len(all_hands) - 1)) * 100
-        return round(percentile, 1)
-    except ValueError:
-        return 0.0
+    only depends on those three, so after warmup every preflop request is a cache hit
+    """
+    hole_cards = [CARDS_BY_INDEX[index1], CARDS_BY_INDEX[index2]]
+    return preflop_strategy.get_dynamic_preflop_action(position, hole_cards, calculate_hand_percentile(hole_cards))
 
 # set up components we need
 hand_evaluator = HandEvaluator()
 equity_calculator = EquityCalculator()
 preflop_strategy = PreflopStrategy()
 
+# expand the built-in ranges into their card arrays at startup, so the first
+# request against each one doesn't have to
+for _builtin_range in (*OPPONENT_RANGES.values(), DEFAULT_VILLAIN_RANGE):
+    _expand_range(_builtin_range)
+
 def register_routes(app):
     """Register all API routes with the Flask app"""
     
@@ -199,7 +323,7 @@ def register_routes(app):
             if len(cards_str) != 5:
                 return jsonify({'error': 'Need exactly 5 cards'}), 400
             
-            cards = [Card(card_str) for card_str in cards_str]
+            cards = [card_from_str(card_str) for card_str in cards_str]
             result = hand_evaluator.evaluate_hand(cards)
             
             return jsonify(result)
@@ -211,92 +335,30 @@ def register_routes(app):
     def calculate_equity():
         """figures out how often you win against their range"""
         try:
-            data = request.json
-            hero_hand_str = data.get('hero_hand', [])
-            villain_range = data.get('villain_range', [])
-            board_str = data.get('board', [])
-            simulations = data.get('simulations', 1000)
-            
-            # check the inputs
-            if len(hero_hand_str) != 2:
-                return jsonify({'error': 'Hero hand must have exactly 2 cards'}), 400
-            
-            hero_hand = [Card(card_str) for card_str in hero_hand_str]
-            board = [Card(card_str) for card_str in board_str]
-            
-            # make sure no duplicate cards
-            validate_no_duplicate_cards(hero_hand, board)
-            
-            # use default top 25% range if no range provided
-            if not villain_range:
-                villain_range = [
-                    'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
-                    'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
-                    'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o', 'A4o', 'A3o', 'A2o',
-                    'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s', 'K3s', 'K2s',
-                    'KQo', 'KJo', 'KTo', 'K9o', 'K8o', 'K7o', 'K6o', 'K5o', 'K4o', 'K3o', 'K2o',
-                    'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s', 'Q5s', 'Q4s', 'Q3s', 'Q2s',
-                    'QJo', 'QTo', 'Q9o', 'Q8o', 'Q7o', 'Q6o', 'Q5o', 'Q4o', 'Q3o', 'Q2o',
-                    'JTs', 'J9s', 'J8s', 'J7s', 'J6s', 'J5s', 'J4s', 'J3s', 'J2s',
-                    'JTo', 'J9o', 'J8o', 'J7o', 'J6o', 'J5o', 'J4o', 'J3o', 'J2o',
-                    'T9s', 'T8s', 'T7s', 'T6s', 'T5s', 'T4s', 'T3s', 'T2s',
-                    'T9o', 'T8o', 'T7o', 'T6o', 'T5o', 'T4o', 'T3o', 'T2o',
-                    '98s', '97s', '96s', '95s', '94s', '93s', '92s',
-                    '98o', '97o', '96o', '95o', '94o', '93o', '92o',
-                    '87s', '86s', '85s', '84s', '83s', '82s',
-                    '87o', '86o', '85o', '84o', '83o', '82o',
-                    '76s', '75s', '74s', '73s', '72s',
-                    '76o', '75o', '74o', '73o', '72o',
-                    '65s', '64s', '63s', '62s',
-                    '65o', '64o', '63o', '62o',
-                    '54s', '53s', '52s',
-                    '54o', '53o', '52o',
-                    '43s', '42s',
-                    '43o', '42o',
-                    '32s', '32o'
-                ]
-            
-            if simulations < 10 or simulations > 10000:
-                return jsonify({'error': 'Simulations must be between 10 and 10000'}), 400
-            
-            # Parse cards with error handling
-            try:
-                board = [Card(card_str) for card_str in board_str]
-            except Exception as e:
-                return jsonify({'error': f'Invalid card format: {str(e)}'}), 400
-            
-            # make sure no duplicate cards
-            all_cards = hero_hand + board
-            card_strings = [str(card) for card in all_cards]
-            if len(card_strings) != len(set(card_strings)):
-                return jsonify({'error': 'Duplicate cards detected in hero hand or board'}), 400
-            
-            # Validate board size
-            if len(board) > 5:
-                return jsonify({'error': 'Board cannot have more than 5 cards'}), 400
-            
-            # Validate no impossible scenarios (like 5 aces on board)
-            if len(board) > 0:
-                board_ranks = [card.rank for card in board]
-                rank_counts = {}
-                for rank in board_ranks:
-                    rank_counts[rank] = rank_counts.get(rank, 0) + 1
-                    if rank_counts[rank] > 4:
-                        return jsonify({'error': f'Impossible: {rank_counts[rank]} {rank}s on board (max 4)'}), 400
-            
-            # Calculate equity
-            equity = equity_calculator.calculate_equity(hero_hand, villain_range, board, simulations)
-            
-            return jsonify({
-                'hero_hand': hero_hand_str,
-                'villain_range': villain_range,
-                'board': board_str,
-                'equity': equity,
-                'simulations': simulations
-            })
+            payload, status = _equity_response(request.json)
+        except Exception as e:  # body that isn't json at all
+            payload, status = {'error': f'Calculation failed: {str(e)}'}, 400
+        return jsonify(payload), status
+
+    @app.route('/calculate_equity_batch', methods=['POST'])
+    def calculate_equity_batch():
+        """/calculate_equity for a list of spots in one round trip"""
+        spots = request.get_json(silent=True)
+        if not isinstance(spots, list) or not spots:
+            return jsonify({'error': 'Need a list of spots'}), 400
+        if len(spots) > MAX_EQUITY_BATCH:
+            return jsonify({'error': f'At most {MAX_EQUITY_BATCH} spots per batch'}), 400
         
-        except Exception as e:
-            return jsonify({'error': f'Calculation failed: {str(e)}'}), 400
+        # every spot goes through the same checks and equity cache as
+        # /calculate_equity, so repeats within (or across) batches are cache hits
+        equities = []
+        for i, spot in enumerate(spots):
+            payload, status = _equity_response(spot if isinstance(spot, dict) else {})
+            if status != 200:
+                return jsonify({'error': f"Spot {i}: {payload['error']}"}), status
+            equities.append(payload['equity'])
+        
+        return jsonify({'equities': equities})
 
     @app.route('/preflop_action', methods=['POST'])
     def preflop_action():
@@ -309,13 +371,10 @@ def register_routes(app):
             if len(hole_cards_str) != 2:
                 return jsonify({'error': 'Need exactly 2 hole cards'}), 400
             
-            hole_cards = [Card(card_str) for card_str in hole_cards_str]
-            
-            # Calculate hand percentile for blending
-            hand_percentile = calculate_hand_percentile(hole_cards)
+            card1, card2 = (card_from_str(card_str) for card_str in hole_cards_str)
             
-            # Use dynamic preflop action that blends chart with calculated risk
-            action = preflop_strategy.get_dynamic_preflop_action(position, hole_cards, hand_percentile)
+            # dynamic preflop action (chart blended with calculated risk), remembered per seat and cards
+            action = _preflop_action(position, card1.index, card2.index)
             
             return jsonify({
                 'position': position,
@@ -337,44 +396,37 @@ def register_routes(app):
             pot_size = data.get('pot_size', 0)
             current_bet = data.get('current_bet', 0)
             
-            hero_hand = [Card(card_str) for card_str in hero_hand_str]
-            board = [Card(card_str) for card_str in board_str]
+            hero_hand = [card_from_str(card_str) for card_str in hero_hand_str]
+            board = [card_from_str(card_str) for card_str in board_str]
             
             # make sure no duplicate cards
-            validate_no_duplicate_cards(hero_hand, board)
+            known_mask = validate_no_duplicate_cards(hero_hand, board)
             
             # Calculate dynamic hand strength against betting-based range
             hand_strength = calculate_dynamic_hand_strength(hero_hand, board, position, pot_size, current_bet)
             
             # Determine hand type for display
             if len(board) >= 3:
-                all_cards = hero_hand + board
-                if len(all_cards) >= 5:
-                    # Get best 5-card hand for display only
-                    from itertools import combinations
-                    best_hand_type = "high_card"
-                    best_strength = 0
-                    
-                    for combo in combinations(all_cards, 5):
-                        hand_result = hand_evaluator.evaluate_hand(list(combo))
-                        if hand_result['strength'] > best_strength:
-                            best_strength = hand_result['strength']
-                            best_hand_type = hand_result['hand_type']
-                else:
-                    best_hand_type = "incomplete"
+                # Get best 5-card hand for display only, straight from the evaluator's
+                # best-hand lookup (gives "incomplete" under 5 cards)
+                best_hand_type = _best_hand_type(known_mask)
             else:
                 best_hand_type = "preflop"
             
             best_hand = {'hand_type': best_hand_type, 'strength': hand_strength}
             
             # Calculate pot odds first
-            pot_odds = current_bet / (pot_size + current_bet) if (pot_size + current_bet) > 0 else 0
+            pot_odds, _ = bet_ratios(pot_size, current_bet)
             
             # Get recommendation based on game stage
             if len(board) == 0:
-                # Preflop: Calculate hand percentile for blending
-                hand_percentile = calculate_hand_percentile(hero_hand)
-                preflop_action = preflop_strategy.get_dynamic_preflop_action(position, hero_hand, hand_percentile)
+                # Preflop: chart blended with the hand percentile. the cache is keyed
+                # on two cards, so anything else goes the long way round
+                if len(hero_hand) == 2:
+                    preflop_action = _preflop_action(position, hero_hand[0].index, hero_hand[1].index)
+                else:
+                    preflop_action = preflop_strategy.get_dynamic_preflop_action(
+                        position, hero_hand, calculate_hand_percentile(hero_hand))
             else:
                 # Postflop: Use hand strength and pot odds
                 preflop_action = preflop_strategy.get_postflop_action(position, hand_strength, pot_odds)
@@ -405,7 +457,7 @@ def register_routes(app):
             if not board_str or len(board_str) < 3:
                 return jsonify({'error': 'Board must have at least 3 cards for range partitioning'}), 400
             
-            board = [Card(c) for c in board_str]
+            board = [card_from_str(c) for c in board_str]
             
             # Partition the range
             categories = partition_range(villain_range, board)
@@ -431,7 +483,7 @@ def register_routes(app):
             if not board_str or len(board_str) < 3:
                 return jsonify({'error': 'Board must have at least 3 cards for dynamic filtering'}), 400
 
-            board = [Card(c) for c in board_str]
+            board = [card_from_str(c) for c in board_str]
 
             # Call the filtering function
             postflop_range = filter_range_for_board(preflop_range, board, player_profile)
@@ -448,147 +500,68 @@ def register_routes(app):
             return jsonify({'error': str(e)}), 400
 
 # Helper functions
-def _get_hand_cards(hand_notation: str, excluded_cards: list) -> list:
-    """Get specific cards for a hand notation, avoiding excluded cards"""
-    if len(hand_notation) < 2:
-        return []
-    
-    # create a deck excluding the specified cards
-    deck = equity_calculator._create_deck(excluded_cards, [])
-    
-    if len(hand_notation) == 2:  # pair like "AA"
-        rank = hand_notation[0]
-        cards = []
-        for suit in ['s', 'h', 'd', 'c']:
-            card_str = f"{rank}{suit}"
-            card = Card(card_str)
-            if card not in excluded_cards:
-                cards.append(card)
-        return cards[:2] if len(cards) >= 2 else []
-    
-    elif hand_notation.endswith('s'):  # suited like "AKs"
-        rank1, rank2 = hand_notation[0], hand_notation[1]
-        # find a suit that works for both cards
-        for suit in ['s', 'h', 'd', 'c']:
-            card1_str = f"{rank1}{suit}"
-            card2_str = f"{rank2}{suit}"
-            card1, card2 = Card(card1_str), Card(card2_str)
-            if card1 not in excluded_cards and card2 not in excluded_cards:
-                return [card1, card2]
-        return []
-    
-    elif hand_notation.endswith('o'):  # offsuit like "AKo"
-        rank1, rank2 = hand_notation[0], hand_notation[1]
-        # find two different suits
-        suits = ['s', 'h', 'd', 'c']
-        for suit1 in suits:
-            for suit2 in suits:
-                if suit1 != suit2:
-                    card1_str = f"{rank1}{suit1}"
-                    card2_str = f"{rank2}{suit2}"
-                    card1, card2 = Card(card1_str), Card(card2_str)
-                    if card1 not in excluded_cards and card2 not in excluded_cards:
-                        return [card1, card2]
-        return []
-    
-    return []
 
-def _calculate_hand_strength_simulation(hero_hand: list) -> float:
-    """Calculate hand strength by simulating against all possible starting hands"""
-    if len(hero_hand) != 2:
-        return 0.0
-    
-    # All possible starting hands (169 total)
-    all_hands = [
-        'AA', 'KK', 'QQ', 'JJ', 'TT', '99', '88', '77', '66', '55', '44', '33', '22',
-        'AKs', 'AQs', 'AJs', 'ATs', 'A9s', 'A8s', 'A7s', 'A6s', 'A5s', 'A4s', 'A3s', 'A2s',
-        'KQs', 'KJs', 'KTs', 'K9s', 'K8s', 'K7s', 'K6s', 'K5s', 'K4s', 'K3s', 'K2s',
-        'QJs', 'QTs', 'Q9s', 'Q8s', 'Q7s', 'Q6s', 'Q5s', 'Q4s', 'Q3s', 'Q2s',
-        'JTs', 'J9s', 'J8s', 'J7s', 'J6s', 'J5s', 'J4s', 'J3s', 'J2s',
-        'T9s', 'T8s', 'T7s', 'T6s', 'T5s', 'T4s', 'T3s', 'T2s',
-        '98s', '97s', '96s', '95s', '94s', '93s', '92s',
-        '87s', '86s', '85s', '84s', '83s', '82s',
-        '76s', '75s', '74s', '73s', '72s',
-        '65s', '64s', '63s', '62s',
-        '54s', '53s', '52s',
-        '43s', '42s',
-        '32s',
-        'AKo', 'AQo', 'AJo', 'ATo', 'A9o', 'A8o', 'A7o', 'A6o', 'A5o', 'A4o', 'A3o', 'A2o',
-        'KQo', 'KJo', 'KTo', 'K9o', 'K8o', 'K7o', 'K6o', 'K5o', 'K4o', 'K3o', 'K2o',
-        'QJo', 'QTo', 'Q9o', 'Q8o', 'Q7o', 'Q6o', 'Q5o', 'Q4o', 'Q3o', 'Q2o',
-        'JTo', 'J9o', 'J8o', 'J7o', 'J6o', 'J5o', 'J4o', 'J3o', 'J2o',
-        'T9o', 'T8o', 'T7o', 'T6o', 'T5o', 'T4o', 'T3o', 'T2o',
-        '98o', '97o', '96o', '95o', '94o', '93o', '92o',
-        '87o', '86o', '85o', '84o', '83o', '82o',
-        '76o', '74o', '73o', '72o',
-        '65o', '64o', '63o', '62o',
-        '54o', '53o', '52o',
-        '43o', '42o',
-        '32o'
-    ]
-    
-    wins = 0
-    total_comparisons = 0
-    simulations_per_hand = 100  # reduced from 400 for performance
-    
-    # get hero hand notation
-    card1, card2 = hero_hand
-    if card1.value == card2.value:
-        hero_notation = f"{card1.rank}{card2.rank}"
-    elif card1.suit == card2.suit:
-        if card1.value > card2.value:
-            hero_notation = f"{card1.rank}{card2.rank}s"
-        else:
-            hero_notation = f"{card2.rank}{card1.rank}s"
-    else:
-        if card1.value > card2.value:
-            hero_notation = f"{card1.rank}{card2.rank}o"
-        else:
-            hero_notation = f"{card2.rank}{card1.rank}o"
-    
-    # skip if hero hand is not in our list
-    if hero_notation not in all_hands:
-        return 0.0
-    
-    # simulate against every other hand
-    for opponent_hand in all_hands:
-        if opponent_hand == hero_notation:
-            continue
-            
-        # run simulations for this matchup
-        for _ in range(simulations_per_hand):
-            # create a random board (5 cards)
-            deck = equity_calculator._create_deck([hero_hand[0], hero_hand[1]], [])
-            board = []
-            
-            # deal 5 board cards
-            for _ in range(5):
-                if deck:
-                    board.append(deck.pop(random.randint(0, len(deck) - 1)))
-            
-            # get opponent's specific cards for this hand type
-            opponent_cards = _get_hand_cards(opponent_hand, [hero_hand[0], hero_hand[1]] + board)
-            if not opponent_cards:
-                continue
-                
-            # evaluate both hands
-            hero_best = equity_calculator._get_best_hand(hero_hand, board)
-            opponent_best = equity_calculator._get_best_hand(opponent_cards, board)
-            
-            # compare hands
-            comparison = equity_calculator._compare_hands(hero_best, opponent_best, hero_hand, opponent_cards, board)
-            if comparison > 0:
-                wins += 1
-            elif comparison == 0:
-                wins += 0.5  # tie
-                
-            total_comparisons += 1
-    
-    if total_comparisons == 0:
-        return 0.0
+def _equity_response(data) -> tuple:
+    """(response body, status) for one /calculate_equity request - shared with the batch endpoint"""
+    try:
+        hero_hand_str = data.get('hero_hand', [])
+        villain_range = data.get('villain_range', [])
+        board_str = data.get('board', [])
+        simulations = data.get('simulations', 1000)
+        tolerance = data.get('tolerance', DEFAULT_EQUITY_TOLERANCE)
+        
+        # check the inputs
+        if len(hero_hand_str) != 2:
+            return {'error': 'Hero hand must have exactly 2 cards'}, 400
+        
+        hero_hand = [card_from_str(card_str) for card_str in hero_hand_str]
+        
+        # Parse cards with error handling (once - everything below reuses this list)
+        try:
+            board = [card_from_str(card_str) for card_str in board_str]
+        except Exception as e:
+            return {'error': f'Invalid card format: {str(e)}'}, 400
+        
+        # make sure no duplicate cards. the masks it works through are all the
+        # equity cache needs, so hang on to them instead of redoing them
+        known_mask = validate_no_duplicate_cards(hero_hand, board)
+        hero_mask = cards_to_mask(hero_hand)
+        board_mask = known_mask & ~hero_mask
+        
+        # use default top 25% range if no range provided. the shared tuple goes
+        # straight through: calculate_equity keys its range cache on it as-is and
+        # jsonify writes it out like a list
+        if not villain_range:
+            villain_range = DEFAULT_VILLAIN_RANGE
         
-    win_rate = wins / total_comparisons
-    return round(win_rate * 100, 1)
+        if simulations < 10 or simulations > 10000:
+            return {'error': 'Simulations must be between 10 and 10000'}, 400
+        
+        if tolerance is not None and not 0 < tolerance < 0.5:
+            return {'error': 'Tolerance must be between 0 and 0.5'}, 400
+        
+        # Validate board size
+        if len(board) > 5:
+            return {'error': 'Board cannot have more than 5 cards'}, 400
+        
+        # Calculate equity - the same spot asked for again (same cards, same range,
+        # same number of runs) comes out of the cache instead of re-simulating
+        equity, showdowns = _cached_range_equity(hero_mask, tuple(villain_range), board_mask, simulations, tolerance)
+        
+        # simulations echoes what was asked for. showdowns is what the answer is
+        # actually based on: fewer when it stopped early, every (villain hand, runout)
+        # pair when the runouts were enumerated, 0 when it never had to deal
+        return {
+            'hero_hand': hero_hand_str,
+            'villain_range': villain_range,
+            'board': board_str,
+            'equity': equity,
+            'simulations': simulations,
+            'showdowns': showdowns
+        }, 200
+    
+    except Exception as e:
+        return {'error': f'Calculation failed: {str(e)}'}, 400
 
 def _get_recommendation(hand_analysis: dict, preflop_action: str, pot_odds: float, board_cards: int) -> str:
     """Get a simple recommendation based on hand strength and pot odds"""
@@ -603,22 +576,12 @@ def _get_recommendation(hand_analysis: dict, preflop_action: str, pot_odds: floa
         else:
             return 'FOLD'
     
-    # Postflop recommendations based on hand type
+    # Postflop recommendations based on hand type: made hands read their action
+    # straight off the table, the rest call only with cheap enough pot odds
     hand_type = hand_analysis.get('hand_type', '')
-    
-    if hand_type in ['royal_flush', 'straight_flush', 'four_kind']:
-        return 'BET/RAISE'
-    elif hand_type in ['full_house', 'flush', 'straight', 'three_kind']:
-        return 'BET/RAISE'
-    elif hand_type in ['two_pair']:
-        return 'BET/CALL'
-    elif hand_type in ['pair']:
-        if pot_odds < 0.3:
-            return 'CALL'
-        else:
-            return 'FOLD'
-    else:  # high_card
-        if pot_odds < 0.2:
-            return 'CALL'
-        else:
-            return 'FOLD'
+    action = MADE_HAND_RECOMMENDATIONS.get(hand_type)
+    if action is not None:
+        return action
+    if pot_odds < CALL_POT_ODDS_BY_HAND_TYPE.get(hand_type, HIGH_CARD_CALL_POT_ODDS):
+        return 'CALL'
+    return 'FOLD'
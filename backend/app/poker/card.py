@@ -1,23 +1,77 @@
+RANKS = '23456789TJQKA'
+SUITS = 'shdc'
+RANK_VALUES = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8,
+               '9': 9, 'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+
+# cactus kev encoding pieces: one prime per rank (deuce..ace) and one bit per suit
+RANK_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+SUIT_BITS = {'s': 0x1000, 'h': 0x2000, 'd': 0x4000, 'c': 0x8000}
+
 # card class: holds rank, suit, and value
 class Card:
+    # fixed attributes and no per-card __dict__: cards get made and passed around
+    # in bulk (every request, the deck tables)
+    __slots__ = ('rank', 'suit', 'value', 'index', 'mask', 'ck', 'name')
+    
     def __init__(self, card_str: str):
         # parse the card string e.g. "As" or "Kh"
         self.rank = card_str[:-1]
         self.suit = card_str[-1]
         self.value = self._get_value()
+        # the string form, made once here since results turn cards back into strings a lot
+        self.name = f"{self.rank}{self.suit}"
+
+        # integer form of the card (0-51, rank-major) and its bit in a 52-bit deck mask
+        if self.value == 0 or self.suit not in SUIT_INDEX:
+            raise ValueError(f"Invalid card: {card_str}")
+        self.index = (self.value - 2) * 4 + SUIT_INDEX[self.suit]
+        self.mask = 1 << self.index
+
+        # cactus kev int: xxxbbbbb bbbbbbbb cdhsrrrr xxpppppp
+        # (b = rank bit, cdhs = suit bit, r = rank, p = rank prime)
+        rank_index = self.value - 2
+        self.ck = ((1 << (16 + rank_index)) | SUIT_BITS[self.suit]
+                   | (rank_index << 8) | RANK_PRIMES[rank_index])
     
     def _get_value(self):
-        rank_values = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, 
-                      '9': 9, 'T': 10, 'J': 11, 'Q': 12, 'K': 13, 'A': 14}
-        return rank_values.get(self.rank, 0)
+        return RANK_VALUES.get(self.rank, 0)
     
     def __str__(self):
-        return f"{self.rank}{self.suit}"
+        return self.name
     
+    # same card <=> same index, so compare and hash the int instead of (rank, suit)
     def __eq__(self, other):
         if not isinstance(other, Card):
             return False
-        return self.rank == other.rank and self.suit == other.suit
+        return self.index == other.index
     
     def __hash__(self):
-        return hash((self.rank, self.suit))
+        return self.index
+
+def cards_to_mask(cards) -> int:
+    """OR together the bits of a bunch of cards"""
+    mask = 0
+    for card in cards:
+        mask |= card.mask
+    return mask
+
+# every card in the deck, looked up by its index
+CARDS_BY_INDEX = tuple(Card(f"{rank}{suit}") for rank in RANKS for suit in SUITS)
+
+def mask_to_cards(mask: int) -> list:
+    """Turn a card mask back into Card objects (lowest index first)"""
+    return [card for card in CARDS_BY_INDEX if card.mask & mask]
+
+# every card looked up by its name ("As", "Td", ...), built once
+CARDS_BY_NAME = {str(card): card for card in CARDS_BY_INDEX}
+
+def card_from_str(card_str: str) -> Card:
+    """The shared Card for a name - a dict lookup instead of parsing a new Card"""
+    card = CARDS_BY_NAME.get(card_str)
+    if card is None:
+        raise ValueError(f"Invalid card: {card_str}")
+    return card
+
+# cactus kev int of each card, looked up by its index (rank * 4 + suit)
+CARD_CKS = tuple(card.ck for card in CARDS_BY_INDEX)
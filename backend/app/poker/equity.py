@@ -1,64 +1,231 @@
-import random
-from typing import List, Dict, Any
-from .card import Card
-from .evaluator import HandEvaluator
+import math
+import numpy as np
+from functools import lru_cache
+from itertools import combinations, permutations
+from typing import List
+from .card import Card, CARDS_BY_INDEX, RANKS, SUITS, card_from_str, cards_to_mask
+from .evaluator import HandEvaluator, best_hand_values, best_hand_values_on_board
+
+# first check (in simulations) on whether the equity estimate has settled. after
+# that every batch is as big as everything run so far, so the checks (and the
+# per-batch overhead) stay few however long it takes to settle
+CONVERGENCE_CHECK_EVERY = 128
+
+# z for the 95% interval the early stop works with
+CONFIDENCE_Z = 1.96
+
+# most simulations to deal and score in one set of array ops (keeps memory flat
+# for big runs - each one is a few hundred bytes of intermediate arrays)
+EQUITY_BATCH_SIZE = 5000
+
+# most board cards left to come where equity is worked out over every runout
+# instead of sampled (1 = the turn: at most 46 rivers per villain hand)
+EXACT_MAX_REMAINING = 1
+
+# up to this many villain hands, exact equity scores every (hand, board) pair in
+# one lookup instead of one lookup per board. that's cheap enough to enumerate
+# the flop too (1081 turn+river pairs), so small ranges get exact flop equity
+EXACT_FLAT_MAX_HANDS = 30
+
+# all 24 ways to relabel the suits, on card indexes (the suit is the low two bits).
+# used for spotting mirror-image matchups and suit-canonical cache keys
+SUIT_INDEX_RELABELINGS = tuple(permutations(range(len(SUITS))))
+
+def _wilson_half_width(p: float, n: int) -> float:
+    """Half-width of the 95% wilson score interval for a rate p over n runs. unlike
+    the plain p +/- z * sqrt(p(1-p)/n) it doesn't collapse to 0 near p = 0 or 1"""
+    z2 = CONFIDENCE_Z * CONFIDENCE_Z
+    return CONFIDENCE_Z / (1 + z2 / n) * math.sqrt(p * (1 - p) / n + z2 / (4 * n * n))
 
 # equity calculator: monte carlo sims to see how often you win
 class EquityCalculator:
     def __init__(self):
         self.evaluator = HandEvaluator()
+        self._rng = np.random.default_rng()
     
     def calculate_equity(self, hero_hand: List[Card], villain_range: List[str], 
-                        board: List[Card] = None, simulations: int = 1000) -> float:
-        """runs a bunch of simulations to see how often you win"""
+                        board: List[Card] = None, simulations: int = 1000,
+                        tol: float = None, min_n: int = CONVERGENCE_CHECK_EVERY) -> float:
+        """runs a bunch of simulations to see how often you win
+        
+        simulations is the max number of runs. if tol is set we stop early once the
+        95% confidence interval on the equity is narrower than +/- tol (after at
+        least min_n runs). tol=None always runs every simulation.
+        """
+        return self.calculate_equity_with_runs(hero_hand, villain_range, board, simulations, tol, min_n)[0]
+    
+    def calculate_equity_with_runs(self, hero_hand: List[Card], villain_range: List[str],
+                                   board: List[Card] = None, simulations: int = 1000,
+                                   tol: float = None, min_n: int = CONVERGENCE_CHECK_EVERY) -> tuple:
+        """calculate_equity plus how many showdowns it actually took: fewer than
+        simulations when it stopped early, every (villain hand, runout) pair when
+        the runouts were enumerated, 0 when there was nothing to simulate"""
         if board is None:
             board = []
         
         wins = 0
+        ties = 0
         total = 0
         
-        # get all possible villain hands from their range
-        all_villain_hands = []
-        for hand_str in villain_range:
-            villain_hands = self._generate_all_combinations(hand_str)
-            all_villain_hands.extend(villain_hands)
-        
-        if not all_villain_hands:
-            return 0.0
-        
-        # run the simulations
-        for _ in range(simulations):
-            # pick a random villain hand from all possible combinations
-            villain_hand = random.choice(all_villain_hands)
-            
-            # check if villain hand conflicts with known cards
-            if self._cards_conflict(villain_hand, hero_hand + board):
-                continue
-            
-            # create a fresh deck excluding ALL known cards (hero + villain + board)
-            deck = self._create_deck(hero_hand + villain_hand, board)
-            random.shuffle(deck)
+        # get all possible villain hands from their range (cached per range) as
+        # parallel arrays: first card index, second card index, combo mask
+        range_firsts, range_seconds, range_masks = _expand_range(tuple(villain_range))
+        
+        # drop villain hands that use a known card (hero + board) up front with
+        # one vectorized AND, so the loop never has to throw a sample away
+        known_mask = cards_to_mask(hero_hand + board)
+        valid = np.flatnonzero((range_masks & np.uint64(known_mask)) == 0)
+        
+        if not len(valid):
+            return 0.0, 0
+        
+        cards_by_index = CARDS_BY_INDEX
+        
+        # self-play shortcut: if every villain hand is just hero's hand with the suits
+        # swapped around (AsAh vs AdAc, AhKh vs AsKs on a board that doesn't care),
+        # the two sides are mirror images so it's a coin flip - no need to simulate
+        if all(self._is_mirror_matchup(hero_hand, (cards_by_index[first], cards_by_index[second]), board)
+               for first, second in zip(range_firsts[valid].tolist(), range_seconds[valid].tolist())):
+            return 0.5, 0
+        
+        remaining_board = 5 - len(board)
+        
+        # hero + board in every row, the runout gets dealt from what's left
+        known = np.array([card.index for card in hero_hand + board], dtype=np.intp)
+        deck = np.flatnonzero((np.uint64(known_mask) >> np.arange(52, dtype=np.uint64)) & np.uint64(1) == 0)
+        
+        # on the turn and river there are few enough runouts (44 rivers, or none) to
+        # score every one, which is exact and cheaper than sampling them. same on
+        # the flop against a handful of villain hands
+        if (remaining_board <= EXACT_MAX_REMAINING
+                or (remaining_board == 2 and len(valid) <= EXACT_FLAT_MAX_HANDS)):
+            return self._exact_equity(known, deck, range_firsts, range_seconds, range_masks, valid, remaining_board)
+        
+        # run the simulations a batch at a time: EQUITY_BATCH_SIZE at a time for a
+        # fixed-size run. when we might stop early the first batch is
+        # CONVERGENCE_CHECK_EVERY and each one after doubles what's been run
+        while total < simulations:
+            batch_size = max(CONVERGENCE_CHECK_EVERY, total) if tol is not None else EQUITY_BATCH_SIZE
+            n = min(batch_size, EQUITY_BATCH_SIZE, simulations - total)
             
-            # complete the board
-            remaining_board = 5 - len(board)
-            full_board = board + deck[:remaining_board]
+            # everyone's villain hand in one draw
+            picks = valid[self._rng.integers(len(valid), size=n)]
+            batch_wins, batch_ties = self._simulate_batch(
+                known, deck, range_firsts[picks].astype(np.intp), range_seconds[picks].astype(np.intp), remaining_board)
+            wins += batch_wins
+            ties += batch_ties
+            total += n
             
-            # evaluate hands
-            hero_best = self._get_best_hand(hero_hand, full_board)
-            villain_best = self._get_best_hand(villain_hand, full_board)
-            
-            # compare hands with proper tie-breaking
-            result = self._compare_hands(hero_best, villain_best, hero_hand, villain_hand, full_board)
-            if result > 0:
-                wins += 1
-            elif result == 0:
-                wins += 0.5
-            
-            total += 1
-        
-        return wins / total if total > 0 else 0.0
+            # early stop once the wilson interval is narrow enough. never on a
+            # clean sweep either way (all wins or all losses so far): that says
+            # nothing about the few percent the other side still has
+            if tol is not None and total >= min_n and 0 < wins + ties / 2 < total:
+                if _wilson_half_width((wins + ties / 2) / total, total) < tol:
+                    break
+        
+        # keep the tallies as ints and only split ties at the end
+        return ((wins + ties / 2) / total if total > 0 else 0.0), total
+    
+    @staticmethod
+    def _exact_equity(known, deck, range_firsts, range_seconds, range_masks, valid, remaining_board) -> tuple:
+        """(equity, showdowns) over every villain hand and every runout (flop, turn or river)
+        
+        a villain hand listed twice in the range still counts twice (same as when
+        sampling), but only gets scored once with its count as the weight
+        """
+        _, first_rows, counts = np.unique(range_masks[valid], return_index=True, return_counts=True)
+        rows = valid[first_rows]
+        holes = np.column_stack((range_firsts[rows], range_seconds[rows])).astype(np.intp)
+        
+        # every board to score on: the board plus each way to deal the rest of it
+        # (1081 turn+river pairs on the flop, 44ish rivers on the turn, just the
+        # board itself on the river)
+        board = known[2:]
+        runouts = list(combinations(deck.tolist(), remaining_board))
+        runouts = np.array(runouts, dtype=np.intp).reshape(len(runouts), remaining_board)
+        boards = np.hstack((np.broadcast_to(board, (len(runouts), len(board))), runouts))
+        hero_values = best_hand_values(np.hstack((np.broadcast_to(known[:2], (len(boards), 2)), boards)))
+        if len(holes) <= EXACT_FLAT_MAX_HANDS:
+            # a few villain hands: one lookup over every (hand, board) pair beats a call per board
+            pairs = np.hstack((np.repeat(holes, len(boards), axis=0), np.tile(boards, (len(holes), 1))))
+            villain_values = best_hand_values(pairs).reshape(len(holes), len(boards))
+        else:
+            # the board stays fixed across all the villain hands, so its part of
+            # the lookup only gets worked out once per board
+            villain_values = np.column_stack([best_hand_values_on_board(holes, runout) for runout in boards])
+        
+        # drop the runouts that use a card villain is holding
+        live = ~(runouts[None, :, :, None] == holes[:, None, None, :]).any(axis=(2, 3))
+        
+        wins = int(np.sum(counts * np.count_nonzero(live & (hero_values > villain_values), axis=1)))
+        ties = int(np.sum(counts * np.count_nonzero(live & (hero_values == villain_values), axis=1)))
+        total = int(np.sum(counts * np.count_nonzero(live, axis=1)))
+        return ((wins + ties / 2) / total if total > 0 else 0.0), total
+    
+    def _simulate_batch(self, known, deck, villain_firsts, villain_seconds, remaining_board) -> tuple:
+        """(wins, ties) for hero over one batch of runouts, all as array ops"""
+        hero_values, villain_values = self._showdown_values(known, deck, villain_firsts, villain_seconds, remaining_board)
+        return int(np.count_nonzero(hero_values > villain_values)), int(np.count_nonzero(hero_values == villain_values))
+    
+    def _showdown_values(self, known, deck, villain_firsts, villain_seconds, remaining_board) -> tuple:
+        """(hero values, villain values) arrays, one entry per row of a batch of runouts
+        
+        known is hero + board card indexes, deck is every card not in known, and
+        each row gets its own villain hand. deal remaining_board + 2 cards off each
+        row's copy of the deck, skip that row's villain cards and the first
+        remaining_board cards left are the runout
+        """
+        n = len(villain_firsts)
+        hero_cards = np.broadcast_to(known, (n, len(known)))
+        if remaining_board:
+            shuffled = self._deal(deck, n, remaining_board + 2)
+            is_villain = (shuffled == villain_firsts[:, None]) | (shuffled == villain_seconds[:, None])
+            # partition on the villain flag pushes their cards past the first
+            # remaining_board slots. the order of the runout doesn't matter, so no
+            # need for a full (stable) sort
+            keep = np.argpartition(is_villain, remaining_board - 1, axis=1)[:, :remaining_board]
+            runout = np.take_along_axis(shuffled, keep, axis=1)
+            hero_cards = np.hstack((hero_cards, runout))
+        
+        board = hero_cards[:, 2:]
+        villain_cards = np.hstack((villain_firsts[:, None], villain_seconds[:, None], board))
+        
+        return best_hand_values(hero_cards), best_hand_values(villain_cards)
     
-    def _generate_all_combinations(self, hand_str: str) -> List[List[Card]]:
+    def _deal(self, deck, n, count) -> np.ndarray:
+        """(n, count) random cards from deck, no repeats within a row
+        
+        partial fisher-yates on every row at once: slot j swaps with a random slot
+        from j on, and only the first count slots ever get dealt (no full shuffle)
+        """
+        cards = np.tile(deck.astype(np.int8), (n, 1))
+        rows = np.arange(n)
+        for j in range(count):
+            picks = self._rng.integers(j, len(deck), size=n)
+            dealt = cards[rows, picks]
+            cards[rows, picks] = cards[:, j]
+            cards[:, j] = dealt
+        return cards[:, :count]
+    
+    @staticmethod
+    def _is_mirror_matchup(hero_hand: List[Card], villain_hand, board: List[Card]) -> bool:
+        """True if some suit relabelling swaps the two hands and leaves the board alone"""
+        if sorted(c.value for c in hero_hand) != sorted(c.value for c in villain_hand):
+            return False
+        
+        # card indexes keep the rank in the high bits and the suit in the low two
+        hero = {c.index for c in hero_hand}
+        villain = {c.index for c in villain_hand}
+        known_board = {c.index for c in board}
+        for perm in SUIT_INDEX_RELABELINGS:
+            if ({(i & ~3) | perm[i & 3] for i in hero} == villain
+                    and {(i & ~3) | perm[i & 3] for i in villain} == hero
+                    and {(i & ~3) | perm[i & 3] for i in known_board} == known_board):
+                return True
+        return False
+    
+    @staticmethod
+    def _generate_all_combinations(hand_str: str) -> List[List[Card]]:
         """Generate all possible card combinations for a hand string"""
         combinations = []
         
@@ -69,343 +236,89 @@ class EquityCalculator:
                 # generate all 6 possible pair combinations
                 for i in range(len(suits)):
                     for j in range(i + 1, len(suits)):
-                        combinations.append([Card(f"{rank}{suits[i]}"), Card(f"{rank}{suits[j]}")])
+                        combinations.append([card_from_str(f"{rank}{suits[i]}"), card_from_str(f"{rank}{suits[j]}")])
             
             elif len(hand_str) == 4:  # two specific cards e.g. 'AsKh'
-                combinations.append([Card(hand_str[:2]), Card(hand_str[2:])])
+                combinations.append([card_from_str(hand_str[:2]), card_from_str(hand_str[2:])])
             
             elif len(hand_str) == 3:  # suited/offsuit e.g. 'AKs' or 'AKo'
                 rank1, rank2 = hand_str[0], hand_str[1]
                 if hand_str.endswith('s'):  # suited
                     suits = ['s', 'h', 'd', 'c']
                     for suit in suits:
-                        combinations.append([Card(f"{rank1}{suit}"), Card(f"{rank2}{suit}")])
+                        combinations.append([card_from_str(f"{rank1}{suit}"), card_from_str(f"{rank2}{suit}")])
                 elif hand_str.endswith('o'):  # offsuit
                     suits = ['s', 'h', 'd', 'c']
                     for i in range(len(suits)):
                         for j in range(len(suits)):
                             if suits[i] != suits[j]:  # different suits
-                                combinations.append([Card(f"{rank1}{suits[i]}"), Card(f"{rank2}{suits[j]}")])
+                                combinations.append([card_from_str(f"{rank1}{suits[i]}"), card_from_str(f"{rank2}{suits[j]}")])
         
         except Exception as e:
             print(f"Error generating combinations for {hand_str}: {e}")
         
         return combinations
+
+def _combo_arrays(combos) -> tuple:
+    """Parallel (first card, second card, mask) arrays for a list of two-card combos"""
+    firsts = np.array([hand[0].index for hand in combos], dtype=np.int8)
+    seconds = np.array([hand[1].index for hand in combos], dtype=np.int8)
+    masks = np.array([cards_to_mask(hand) for hand in combos], dtype=np.uint64)
     
-    def _cards_conflict(self, hand1: List[Card], hand2: List[Card]) -> bool:
-        """Check if two hands share any cards"""
-        for card1 in hand1:
-            for card2 in hand2:
-                if str(card1) == str(card2):
-                    return True
-        return False
-    
-    def _create_deck(self, known_cards: List[Card], board: List[Card]) -> List[Card]:
-        """Create a deck excluding known cards"""
-        all_cards = []
-        ranks = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'J', 'Q', 'K', 'A']
-        suits = ['s', 'h', 'd', 'c']
-        
-        for rank in ranks:
-            for suit in suits:
-                card = Card(f"{rank}{suit}")
-                if not self._cards_conflict([card], known_cards + board):
-                    all_cards.append(card)
-        
-        return all_cards
-    
-    def _get_best_hand(self, hole_cards: List[Card], board: List[Card]) -> Dict[str, Any]:
-        """Get the best 5-card hand from hole cards and board"""
-        all_cards = hole_cards + board
-        if len(all_cards) < 5:
-            return {'strength': 0, 'hand_type': 'incomplete'}
-        
-        # Try all combinations of 5 cards
-        best_hand = None
-        best_strength = 0
-        
-        from itertools import combinations
-        for combo in combinations(all_cards, 5):
-            hand_result = self.evaluator.evaluate_hand(list(combo))
-            if hand_result['strength'] > best_strength:
-                best_strength = hand_result['strength']
-                best_hand = hand_result
-        
-        return best_hand or {'strength': 0, 'hand_type': 'incomplete'}
-    
-    def _compare_hands(self, hero_hand: Dict, villain_hand: Dict, hero_cards: List[Card], 
-                      villain_cards: List[Card], board: List[Card]) -> int:
-        """Compare two hands and return 1 if hero wins, -1 if villain wins, 0 if tie"""
-        hero_strength = hero_hand['strength']
-        villain_strength = villain_hand['strength']
-        
-        # Different hand types - higher strength wins
-        if hero_strength > villain_strength:
-            return 1
-        elif hero_strength < villain_strength:
-            return -1
-        
-        # Same hand type - need to compare kickers
-        hero_type = hero_hand['hand_type']
-        villain_type = villain_hand['hand_type']
-        
-        if hero_type != villain_type:
-            return 0  # Shouldn't happen, but safety check
-        
-        # Get the best 5-card hands for both players
-        hero_best_5 = self._get_best_5_cards(hero_cards, board)
-        villain_best_5 = self._get_best_5_cards(villain_cards, board)
-        
-        # Compare based on hand type
-        if hero_type == 'pair':
-            return self._compare_pairs(hero_best_5, villain_best_5)
-        elif hero_type == 'two_pair':
-            return self._compare_two_pairs(hero_best_5, villain_best_5)
-        elif hero_type == 'three_kind':
-            return self._compare_three_of_a_kind(hero_best_5, villain_best_5)
-        elif hero_type == 'straight':
-            return self._compare_straights(hero_best_5, villain_best_5)
-        elif hero_type == 'flush':
-            return self._compare_flushes(hero_best_5, villain_best_5)
-        elif hero_type == 'full_house':
-            return self._compare_full_houses(hero_best_5, villain_best_5)
-        elif hero_type == 'four_kind':
-            return self._compare_four_of_a_kind(hero_best_5, villain_best_5)
-        elif hero_type in ['straight_flush', 'royal_flush']:
-            return self._compare_straights(hero_best_5, villain_best_5)
-        else:  # high_card
-            return self._compare_high_cards(hero_best_5, villain_best_5)
-    
-    def _get_best_5_cards(self, hole_cards: List[Card], board: List[Card]) -> List[Card]:
-        """Get the best 5-card combination from hole cards and board"""
-        all_cards = hole_cards + board
-        if len(all_cards) < 5:
-            return all_cards
-        
-        best_hand = None
-        best_strength = 0
-        
-        from itertools import combinations
-        for combo in combinations(all_cards, 5):
-            hand_result = self.evaluator.evaluate_hand(list(combo))
-            if hand_result['strength'] > best_strength:
-                best_strength = hand_result['strength']
-                best_hand = list(combo)
-        
-        return best_hand or all_cards[:5]
-    
-    def _compare_pairs(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare pair hands"""
-        hero_values = sorted([c.value for c in hero_cards], reverse=True)
-        villain_values = sorted([c.value for c in villain_cards], reverse=True)
-        
-        # Find the pair values
-        hero_pair = None
-        villain_pair = None
-        
-        for i in range(4):
-            if hero_values[i] == hero_values[i+1]:
-                hero_pair = hero_values[i]
-                break
-        
-        for i in range(4):
-            if villain_values[i] == villain_values[i+1]:
-                villain_pair = villain_values[i]
-                break
-        
-        if hero_pair > villain_pair:
-            return 1
-        elif hero_pair < villain_pair:
-            return -1
-        
-        # Same pair, compare kickers
-        hero_kickers = [v for v in hero_values if v != hero_pair]
-        villain_kickers = [v for v in villain_values if v != villain_pair]
-        
-        for i in range(len(hero_kickers)):
-            if hero_kickers[i] > villain_kickers[i]:
-                return 1
-            elif hero_kickers[i] < villain_kickers[i]:
-                return -1
-        
-        return 0
-    
-    def _compare_high_cards(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare high card hands"""
-        hero_values = sorted([c.value for c in hero_cards], reverse=True)
-        villain_values = sorted([c.value for c in villain_cards], reverse=True)
-        
-        for i in range(5):
-            if hero_values[i] > villain_values[i]:
-                return 1
-            elif hero_values[i] < villain_values[i]:
-                return -1
-        
-        return 0
-    
-    def _compare_three_of_a_kind(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare three of a kind hands"""
-        hero_values = sorted([c.value for c in hero_cards], reverse=True)
-        villain_values = sorted([c.value for c in villain_cards], reverse=True)
-        
-        # Find the three of a kind values
-        hero_trips = None
-        villain_trips = None
-        
-        for i in range(3):
-            if hero_values[i] == hero_values[i+1] == hero_values[i+2]:
-                hero_trips = hero_values[i]
-                break
-        
-        for i in range(3):
-            if villain_values[i] == villain_values[i+1] == villain_values[i+2]:
-                villain_trips = villain_values[i]
-                break
-        
-        if hero_trips > villain_trips:
-            return 1
-        elif hero_trips < villain_trips:
-            return -1
-        
-        # Same trips, compare kickers
-        hero_kickers = [v for v in hero_values if v != hero_trips]
-        villain_kickers = [v for v in villain_values if v != villain_trips]
-        
-        for i in range(len(hero_kickers)):
-            if hero_kickers[i] > villain_kickers[i]:
-                return 1
-            elif hero_kickers[i] < villain_kickers[i]:
-                return -1
-        
-        return 0
-    
-    def _compare_straights(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare straight hands"""
-        return self._compare_high_cards(hero_cards, villain_cards)
-    
-    def _compare_flushes(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare flush hands"""
-        return self._compare_high_cards(hero_cards, villain_cards)
-    
-    def _compare_full_houses(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare full house hands"""
-        hero_values = sorted([c.value for c in hero_cards], reverse=True)
-        villain_values = sorted([c.value for c in villain_cards], reverse=True)
-        
-        # Find the three of a kind and pair values
-        hero_trips = None
-        hero_pair = None
-        villain_trips = None
-        villain_pair = None
-        
-        # Count occurrences
-        hero_counts = {}
-        villain_counts = {}
-        for v in hero_values:
-            hero_counts[v] = hero_counts.get(v, 0) + 1
-        for v in villain_values:
-            villain_counts[v] = villain_counts.get(v, 0) + 1
-        
-        for v, count in hero_counts.items():
-            if count == 3:
-                hero_trips = v
-            elif count == 2:
-                hero_pair = v
-        
-        for v, count in villain_counts.items():
-            if count == 3:
-                villain_trips = v
-            elif count == 2:
-                villain_pair = v
-        
-        # Compare trips first
-        if hero_trips > villain_trips:
-            return 1
-        elif hero_trips < villain_trips:
-            return -1
-        
-        # Same trips, compare pairs
-        if hero_pair > villain_pair:
-            return 1
-        elif hero_pair < villain_pair:
-            return -1
-        
-        return 0
+    # these get shared between calls, so make sure nobody writes into them
+    for arr in (firsts, seconds, masks):
+        arr.setflags(write=False)
+    return firsts, seconds, masks
+
+# every pair, suited and offsuit notation ('AA', 'AKs', 'AKo', ...) already
+# expanded, so a range made of them is just its hands' arrays glued together
+HAND_COMBO_ARRAYS = {
+    hand_str: _combo_arrays(EquityCalculator._generate_all_combinations(hand_str))
+    for high in range(len(RANKS) - 1, -1, -1)
+    for low in range(high, -1, -1)
+    for hand_str in ((RANKS[high] * 2,) if high == low
+                     else (RANKS[high] + RANKS[low] + 's', RANKS[high] + RANKS[low] + 'o'))
+}
+
+@lru_cache(maxsize=4096)
+def _expand_range(range_key: tuple) -> tuple:
+    """Expand a range into parallel (first card, second card, mask) arrays, cached per distinct range"""
+    # specific combos ('AsKh') and anything unusual get expanded on the spot
+    parts = [HAND_COMBO_ARRAYS.get(hand_str)
+             or _combo_arrays(EquityCalculator._generate_all_combinations(hand_str))
+             for hand_str in range_key]
+    if len(parts) == 1:
+        return parts[0]
+    if not parts:
+        return _combo_arrays([])
     
-    def _compare_four_of_a_kind(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare four of a kind hands"""
-        hero_values = sorted([c.value for c in hero_cards], reverse=True)
-        villain_values = sorted([c.value for c in villain_cards], reverse=True)
-        
-        # Find the four of a kind values
-        hero_quads = None
-        villain_quads = None
-        
-        for i in range(2):
-            if hero_values[i] == hero_values[i+1] == hero_values[i+2] == hero_values[i+3]:
-                hero_quads = hero_values[i]
-                break
-        
-        for i in range(2):
-            if villain_values[i] == villain_values[i+1] == villain_values[i+2] == villain_values[i+3]:
-                villain_quads = villain_values[i]
-                break
-        
-        if hero_quads > villain_quads:
-            return 1
-        elif hero_quads < villain_quads:
-            return -1
-        
-        # Same quads, compare kicker
-        hero_kicker = [v for v in hero_values if v != hero_quads][0]
-        villain_kicker = [v for v in villain_values if v != villain_quads][0]
-        
-        if hero_kicker > villain_kicker:
-            return 1
-        elif hero_kicker < villain_kicker:
-            return -1
-        
-        return 0
+    firsts, seconds, masks = (np.concatenate(column) for column in zip(*parts))
+    for arr in (firsts, seconds, masks):
+        arr.setflags(write=False)
+    return firsts, seconds, masks
+
+def canonical_composition(*masks) -> tuple:
+    """The same card masks with the suits relabeled to one fixed representative
     
-    def _compare_two_pairs(self, hero_cards: List[Card], villain_cards: List[Card]) -> int:
-        """Compare two pair hands"""
-        hero_values = sorted([c.value for c in hero_cards], reverse=True)
-        villain_values = sorted([c.value for c in villain_cards], reverse=True)
-        
-        # Find the pair values
-        hero_pairs = []
-        villain_pairs = []
-        
-        for i in range(4):
-            if hero_values[i] == hero_values[i+1] and hero_values[i] not in hero_pairs:
-                hero_pairs.append(hero_values[i])
-        
-        for i in range(4):
-            if villain_values[i] == villain_values[i+1] and villain_values[i] not in villain_pairs:
-                villain_pairs.append(villain_values[i])
-        
-        hero_pairs.sort(reverse=True)
-        villain_pairs.sort(reverse=True)
-        
-        # Compare higher pair
-        if hero_pairs[0] > villain_pairs[0]:
-            return 1
-        elif hero_pairs[0] < villain_pairs[0]:
-            return -1
-        
-        # Compare lower pair
-        if hero_pairs[1] > villain_pairs[1]:
-            return 1
-        elif hero_pairs[1] < villain_pairs[1]:
-            return -1
-        
-        # Compare kicker
-        hero_kicker = [v for v in hero_values if v not in hero_pairs][0]
-        villain_kicker = [v for v in villain_values if v not in villain_pairs][0]
-        
-        if hero_kicker > villain_kicker:
-            return 1
-        elif hero_kicker < villain_kicker:
-            return -1
-        
-        return 0
+    renaming suits doesn't change who wins, so every suit-swapped version of a
+    spot (AsAh on Kd7c2s, AdAc on Kh7s2d, ...) gets the same address - take the
+    smallest relabeling of all 24. only use this when nothing else in the spot
+    names a suit (e.g. the villain range has no specific combos like 'AsKh')
+    """
+    card_lists = [[i for i in range(52) if mask >> i & 1] for mask in masks]
+    best = None
+    for perm in SUIT_INDEX_RELABELINGS:
+        relabeled = []
+        for indexes in card_lists:
+            mask = 0
+            for i in indexes:
+                mask |= 1 << ((i & ~3) | perm[i & 3])
+            relabeled.append(mask)
+        relabeled = tuple(relabeled)
+        if best is None or relabeled < best:
+            best = relabeled
+    return best
+
+def is_suit_blind(villain_range) -> bool:
+    """True if the range is all pair/suited/offsuit notation (no specific cards)"""
+    return all(len(hand_str) != 4 for hand_str in villain_range)
@@ -1,5 +1,243 @@
+from itertools import combinations, combinations_with_replacement
 from typing import List, Dict, Any
-from .card import Card
+import numpy as np
+from .card import Card, CARD_CKS, RANK_PRIMES, cards_to_mask
+
+# how many (hole cards, board) categories to remember before starting over
+CATEGORY_CACHE_SIZE = 100000
+
+# best-hand types get_hand_category lumps together as "NUT_MADE_HAND"
+NUT_MADE_HAND_TYPES = frozenset({'straight_flush', 'four_kind', 'full_house', 'flush', 'straight'})
+
+# hand type names by strength (same numbers as HandEvaluator.hand_rankings)
+HAND_TYPE_NAMES = {
+    1: 'high_card', 2: 'pair', 3: 'two_pair', 4: 'three_kind', 5: 'straight',
+    6: 'flush', 7: 'full_house', 8: 'four_kind', 9: 'straight_flush', 10: 'royal_flush'
+}
+
+# a hand value is the strength with the tie-break ranks packed in under it (4 bits
+# each), so any two hands order correctly as one int compare. strength = value >> 20
+STRENGTH_SHIFT = 20
+
+def _hand_value(strength: int, ranks: tuple) -> int:
+    """One int that orders 5-card hands fully: the strength, then the ranks that
+    break ties (most-repeated first, then highest), 4 bits each. ranks are 0-12"""
+    values = sorted((r + 2 for r in ranks), key=lambda v: (ranks.count(v - 2), v), reverse=True)
+    if values == [14, 5, 4, 3, 2] and strength in (5, 9):
+        values = [5, 4, 3, 2, 1]  # the wheel is a 5-high straight
+    value = strength
+    for v in values:
+        value = value << 4 | v
+    return value
+
+def _build_hand_value_tables():
+    """_hand_value for every 5-card hand, looked up two ways:
+    
+    - flushes by the OR of the rank bits (all five ranks are different)
+    - everything else by the product of the five rank primes, which is unique
+      per multiset of ranks (same idea as the cactus kev evaluator)
+    
+    7462 different values in all, one per distinct hand
+    """
+    flushes = {}
+    products = {}
+    for ranks in combinations_with_replacement(range(13), 5):
+        counts = sorted((ranks.count(r) for r in set(ranks)), reverse=True)
+        if counts[0] > 4:
+            continue  # five of a kind isn't a hand
+        
+        product = 1
+        for r in ranks:
+            product *= RANK_PRIMES[r]
+        
+        if counts == [4, 1]:
+            products[product] = _hand_value(8, ranks)  # four of a kind
+        elif counts == [3, 2]:
+            products[product] = _hand_value(7, ranks)  # full house
+        elif counts == [3, 1, 1]:
+            products[product] = _hand_value(4, ranks)  # three of a kind
+        elif counts == [2, 2, 1]:
+            products[product] = _hand_value(3, ranks)  # two pair
+        elif counts == [2, 1, 1, 1]:
+            products[product] = _hand_value(2, ranks)  # pair
+        else:
+            # five different ranks: a straight if they run (A-2-3-4-5 counts too)
+            is_straight = ranks[4] - ranks[0] == 4 or ranks == (0, 1, 2, 3, 12)
+            products[product] = _hand_value(5 if is_straight else 1, ranks)
+            
+            rank_bits = 0
+            for r in ranks:
+                rank_bits |= 1 << r
+            if not is_straight:
+                flushes[rank_bits] = _hand_value(6, ranks)
+            elif ranks[0] == 8:  # Royal flush (A, K, Q, J, 10)
+                flushes[rank_bits] = _hand_value(10, ranks)
+            else:
+                flushes[rank_bits] = _hand_value(9, ranks)
+    return flushes, products
+
+FLUSH_HAND_VALUES, PRODUCT_HAND_VALUES = _build_hand_value_tables()
+
+def _build_best_hand_tables():
+    """Best hand value for 5, 6 or 7 cards, keyed the same two ways
+    
+    - no flush: by the product of all the rank primes (still unique per multiset
+      of ranks, whatever the size)
+    - flush: by the rank bits of the suit with 5+ cards. with 7 cards or fewer a
+      flush can't also have quads or a full house, so it's always the best hand
+    
+    filled in from the 5-card tables: the best of n cards is the best of the n-1
+    card hands left after dropping any one of them. so a 7-card hand is two
+    lookups instead of 21 five-card ones (same job as the 2+2 state machine,
+    without a 130MB table)
+    """
+    products = dict(PRODUCT_HAND_VALUES)
+    flushes = dict(FLUSH_HAND_VALUES)
+    for size in (6, 7):
+        for ranks in combinations_with_replacement(range(13), size):
+            if max(ranks.count(r) for r in ranks) > 4:
+                continue
+            product = 1
+            for r in ranks:
+                product *= RANK_PRIMES[r]
+            products[product] = max(products[product // RANK_PRIMES[r]] for r in set(ranks))
+        
+        for ranks in combinations(range(13), size):
+            rank_bits = 0
+            for r in ranks:
+                rank_bits |= 1 << r
+            flushes[rank_bits] = max(flushes[rank_bits & ~(1 << r)] for r in ranks)
+    return flushes, products
+
+BEST_FLUSH_VALUES, BEST_PRODUCT_VALUES = _build_best_hand_tables()
+
+# the same tables as arrays for the batch paths: values indexed by flush rank bits
+# (0 where there's no flush), and the prime products sorted so a whole batch can
+# searchsorted them
+FLUSH_VALUES = np.zeros(1 << 13, dtype=np.int64)
+for _bits, _value in BEST_FLUSH_VALUES.items():
+    FLUSH_VALUES[_bits] = _value
+PRODUCT_KEYS = np.array(sorted(BEST_PRODUCT_VALUES), dtype=np.int64)
+PRODUCT_VALUES = np.array([BEST_PRODUCT_VALUES[k] for k in PRODUCT_KEYS.tolist()], dtype=np.int64)
+CK_BY_INDEX = np.array(CARD_CKS, dtype=np.int64)
+
+def best_hand_values(card_indexes: np.ndarray) -> np.ndarray:
+    """Best hand value for each row of an (N, 5-7) array of card indexes
+    
+    the whole batch goes through the best-hand tables as numpy ops, so there's
+    no python work per hand
+    """
+    ck = CK_BY_INDEX[card_indexes]
+    rank_bits = ck >> 16
+    
+    # rank bits of whichever suit has 5+ cards in each row (0 if none does)
+    flush_bits = np.zeros(len(ck), dtype=np.int64)
+    for suit_bit in (0x1000, 0x2000, 0x4000, 0x8000):
+        in_suit = (ck & suit_bit) != 0
+        suit_ranks = np.bitwise_or.reduce(np.where(in_suit, rank_bits, 0), axis=1)
+        flush_bits = np.where(in_suit.sum(axis=1) >= 5, suit_ranks, flush_bits)
+    
+    product_values = PRODUCT_VALUES[np.searchsorted(PRODUCT_KEYS, np.prod(ck & 0xFF, axis=1))]
+    return np.where(flush_bits != 0, FLUSH_VALUES[flush_bits], product_values)
+
+def best_hand_values_on_board(hole_indexes: np.ndarray, board_indexes) -> np.ndarray:
+    """best_hand_values for many two-card hands on one fixed 3-5 card board
+    
+    the board's part of each lookup (its prime product, and each suit's card count
+    and rank bits) gets worked out once up front, then each row only adds its
+    two hole cards to it
+    """
+    board_cks = [CARD_CKS[i] for i in board_indexes]
+    board_product = 1
+    for c in board_cks:
+        board_product *= c & 0xFF
+    
+    hole = CK_BY_INDEX[hole_indexes]
+    first, second = hole[:, 0], hole[:, 1]
+    
+    flush_bits = np.zeros(len(hole), dtype=np.int64)
+    for suit_bit in (0x1000, 0x2000, 0x4000, 0x8000):
+        board_suit = [c for c in board_cks if c & suit_bit]
+        # with two hole cards at most, a suit needs 3+ on the board to make a flush
+        if len(board_suit) < 3:
+            continue
+        board_bits = 0
+        for c in board_suit:
+            board_bits |= c >> 16
+        first_in, second_in = (first & suit_bit) != 0, (second & suit_bit) != 0
+        suit_ranks = (board_bits | np.where(first_in, first >> 16, 0) | np.where(second_in, second >> 16, 0))
+        flush_bits = np.where(len(board_suit) + first_in + second_in >= 5, suit_ranks, flush_bits)
+    
+    products = board_product * (first & 0xFF) * (second & 0xFF)
+    product_values = PRODUCT_VALUES[np.searchsorted(PRODUCT_KEYS, products)]
+    return np.where(flush_bits != 0, FLUSH_VALUES[flush_bits], product_values)
+
+def hand_value_of(c0: int, c1: int, c2: int, c3: int, c4: int) -> int:
+    """Hand value of five cactus kev ints"""
+    # all five share a suit bit only if it's a flush, then the OR'd rank bits say
+    # which one. otherwise multiply the rank primes
+    if c0 & c1 & c2 & c3 & c4 & 0xF000:
+        return FLUSH_HAND_VALUES[(c0 | c1 | c2 | c3 | c4) >> 16]
+    return PRODUCT_HAND_VALUES[(c0 & 0xFF) * (c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF)]
+
+def hand_type_of(c0: int, c1: int, c2: int, c3: int, c4: int) -> tuple:
+    """(hand_type, strength) for five cactus kev ints"""
+    strength = hand_value_of(c0, c1, c2, c3, c4) >> STRENGTH_SHIFT
+    return HAND_TYPE_NAMES[strength], strength
+
+def best_hand_of_cks(cks) -> int:
+    """Value of the best 5 out of a list of cactus kev ints (0 for fewer than 5)
+    
+    plain ints all the way through - no Card attribute reads per card
+    """
+    if not 5 <= len(cks) <= 7:
+        # the best-hand tables stop at 7 cards, anything bigger checks every 5
+        return max((hand_value_of(*combo) for combo in combinations(cks, 5)), default=0)
+    
+    # multiply the rank primes and collect each suit's rank bits in one pass
+    product = 1
+    suits = {}
+    for c in cks:
+        product *= c & 0xFF
+        suits[c & 0xF000] = suits.get(c & 0xF000, 0) | c >> 16
+    
+    # only a suit with 5+ cards is in the flush table
+    for rank_bits in suits.values():
+        value = BEST_FLUSH_VALUES.get(rank_bits)
+        if value:
+            return value
+    return BEST_PRODUCT_VALUES[product]
+
+# best hand result: what the best-of-n loops hand back (one per player per simulation,
+# so it's a small fixed-slot object instead of a dict)
+class HandResult:
+    __slots__ = ('hand_type', 'strength', 'value')
+    
+    def __init__(self, hand_type: str, strength: int, value: int = 0):
+        self.hand_type = hand_type
+        self.strength = strength
+        self.value = value  # full hand value, kickers and all (see _hand_value)
+    
+    def __repr__(self):
+        return f"HandResult({self.hand_type!r}, {self.strength}, {self.value})"
+
+INCOMPLETE_HAND = HandResult('incomplete', 0)
+
+# the 5-bit windows _has_straight_draw counts: both ends and one middle rank
+GUTSHOT_WINDOWS = frozenset({0b10011, 0b10101, 0b11001})
+
+def _has_straight_draw(rank_bits: int) -> bool:
+    """Straight draw test on a 13-bit rank mask (bit 0 = deuce, bit 12 = ace)
+    
+    four ranks in a row (an open-ender or better), or a 5-rank window with both
+    ends and exactly one rank in between (a gutshot-style 3 card run)
+    """
+    if rank_bits & rank_bits >> 1 & rank_bits >> 2 & rank_bits >> 3:
+        return True
+    return any((rank_bits >> low) & 0x1F in GUTSHOT_WINDOWS for low in range(9))
+
+# _has_straight_draw for every rank mask, so a hand only has to OR its rank bits
+STRAIGHT_DRAWS = tuple(_has_straight_draw(rank_bits) for rank_bits in range(1 << 13))
 
 # hand evaluator: figures out what hand you have
 class HandEvaluator:
@@ -9,6 +247,9 @@ class HandEvaluator:
             'straight': 5, 'flush': 6, 'full_house': 7, 'four_kind': 8,
             'straight_flush': 9, 'royal_flush': 10
         }
+        # (hole mask, board mask) -> hand category. the category doesn't care what
+        # order the cards come in, so the masks make a good key
+        self._category_cache = {}
     
     def evaluate_hand(self, cards: List[Card]) -> Dict[str, Any]:
         """Evaluate a 5-card hand and return its strength"""
@@ -24,85 +265,60 @@ class HandEvaluator:
         return {
             'hand_type': hand_type,
             'strength': strength,
-            'cards': [str(card) for card in sorted_cards]
+            'cards': [card.name for card in sorted_cards]
         }
     
     def _get_hand_type(self, cards: List[Card]) -> tuple:
         """Determine hand type and calculate strength"""
-        values = [card.value for card in cards]
-        suits = [card.suit for card in cards]
-        
-        # Count occurrences of each value
-        value_counts = {}
-        for value in values:
-            value_counts[value] = value_counts.get(value, 0) + 1
-        
-        counts = sorted(value_counts.values(), reverse=True)
-        is_flush = len(set(suits)) == 1
-        is_straight = self._is_straight(values)
-        
-        # Determine hand type with proper ranking
-        if is_straight and is_flush:
-            if min(values) == 10:  # Royal flush (A, K, Q, J, 10)
-                return 'royal_flush', 10
-            else:
-                return 'straight_flush', 9
-        elif counts == [4, 1]:
-            return 'four_kind', 8
-        elif counts == [3, 2]:
-            return 'full_house', 7
-        elif is_flush:
-            return 'flush', 6
-        elif is_straight:
-            return 'straight', 5
-        elif counts == [3, 1, 1]:
-            return 'three_kind', 4
-        elif counts == [2, 2, 1]:
-            return 'two_pair', 3
-        elif counts == [2, 1, 1, 1]:
-            return 'pair', 2
-        else:
-            return 'high_card', 1
+        c0, c1, c2, c3, c4 = [card.ck for card in cards]
+        return hand_type_of(c0, c1, c2, c3, c4)
     
-    def _is_straight(self, values: List[int]) -> bool:
-        """Check if values form a straight"""
-        sorted_values = sorted(set(values))
-        if len(sorted_values) != 5:
-            return False
-        
-        # Check for regular straight
-        if sorted_values[-1] - sorted_values[0] == 4:
-            return True
+    def get_hand_category(self, hole_cards: List[Card], board: List[Card], board_mask: int = None) -> str:
+        """Provides a detailed category of a hand's connection to the board.
         
-        # Check for A-2-3-4-5 straight
-        if sorted_values == [2, 3, 4, 5, 14]:
-            return True
-        
-        return False
-    
-    def get_hand_category(self, hole_cards: List[Card], board: List[Card]) -> str:
-        """Provides a detailed category of a hand's connection to the board."""
+        loops over a range on one board can pass board_mask (cards_to_mask(board))
+        so it's worked out once instead of once per hand
+        """
         if len(board) < 3:
             return "PREFLOP"
+        if board_mask is None:
+            board_mask = cards_to_mask(board)
+        
+        # same hole cards on the same board = same answer (e.g. filtering then
+        # partitioning one range on one flop), so only work each one out once
+        key = (cards_to_mask(hole_cards), board_mask)
+        category = self._category_cache.get(key)
+        if category is None:
+            # keep memory bounded - just start over when it fills up
+            if len(self._category_cache) >= CATEGORY_CACHE_SIZE:
+                self._category_cache.clear()
+            category = self._categorize_hand(hole_cards, board)
+            self._category_cache[key] = category
+        return category
+    
+    def _categorize_hand(self, hole_cards: List[Card], board: List[Card]) -> str:
+        """get_hand_category without the cache"""
 
         # --- Board Analysis ---
         board_ranks = [c.value for c in board]
-        board_suits = [c.suit for c in board]
         top_board_card = max(board_ranks) if board_ranks else 0
-        is_board_paired = len(set(board_ranks)) < len(board_ranks)
 
         # --- Hand Analysis ---
-        best_hand_result = self._get_best_hand(hole_cards, board)
-        hand_type = best_hand_result['hand_type']
+        # one hole + board list for the whole call (best hand and draws both use it)
+        all_cards = hole_cards + board
+        best_hand_result = self._best_hand_of(all_cards)
+        hand_type = best_hand_result.hand_type
         hole_ranks = [c.value for c in hole_cards]
+        # worked out once, the set and overpair checks both want it
+        is_pocket_pair = hole_ranks[0] == hole_ranks[1]
 
         # --- Made Hand Categories (strongest first) ---
-        if hand_type in ['straight_flush', 'four_kind', 'full_house', 'flush', 'straight']:
+        if hand_type in NUT_MADE_HAND_TYPES:
             return "NUT_MADE_HAND"
 
         if hand_type == 'three_kind':
             # Check if it's a set (pocket pair) or trips
-            if hole_cards[0].value == hole_cards[1].value:
+            if is_pocket_pair:
                 return "SET"
             else:
                 return "TRIPS"
@@ -116,7 +332,7 @@ class HandEvaluator:
 
         if hand_type == 'pair':
             # Overpair: Pocket pair higher than the board's highest card
-            if hole_cards[0].value == hole_cards[1].value and hole_cards[0].value > top_board_card:
+            if is_pocket_pair and hole_ranks[0] > top_board_card:
                 return "OVERPAIR"
             # Top Pair
             if max(hole_ranks) == top_board_card:
@@ -125,11 +341,12 @@ class HandEvaluator:
             return "MID_WEAK_PAIR"
 
         # --- Drawing Hand Categories ---
-        all_cards = hole_cards + board
-        all_suits = [c.suit for c in all_cards]
-        # Flush Draw
-        from collections import Counter
-        if any(count == 4 for count in Counter(all_suits).values()):
+        # Flush Draw: count each suit in a fixed 4-slot array (the suit is the
+        # low two bits of the card index)
+        suit_counts = bytearray(4)
+        for c in all_cards:
+            suit_counts[c.index & 3] += 1
+        if 4 in suit_counts:
             return "FLUSH_DRAW"
 
         # Straight Draw (implement a helper for this)
@@ -139,38 +356,19 @@ class HandEvaluator:
         # --- No Connection ---
         return "NO_MADE_HAND_OR_DRAW"
     
-    def _get_best_hand(self, hole_cards: List[Card], board: List[Card]) -> Dict[str, Any]:
-        """Get the best 5-card hand from hole cards and board"""
-        from itertools import combinations
-        
-        all_cards = hole_cards + board
-        if len(all_cards) < 5:
-            return {'hand_type': 'incomplete', 'strength': 0}
-        
-        best_hand = None
-        best_strength = 0
-        
-        for combo in combinations(all_cards, 5):
-            hand_result = self.evaluate_hand(list(combo))
-            if hand_result['strength'] > best_strength:
-                best_strength = hand_result['strength']
-                best_hand = hand_result
-        
-        return best_hand if best_hand else {'hand_type': 'incomplete', 'strength': 0}
+    def _best_hand_of(self, all_cards: List[Card]) -> HandResult:
+        """Get the best 5-card hand out of hole cards + board as one list"""
+        # one lookup on the cards' cactus kev ints, no combinations to try
+        value = best_hand_of_cks([card.ck for card in all_cards])
+        if not value:
+            return INCOMPLETE_HAND
+        strength = value >> STRENGTH_SHIFT
+        return HandResult(HAND_TYPE_NAMES[strength], strength, value)
     
     def _is_straight_draw(self, cards: List[Card]) -> bool:
         """Check if cards contain a straight draw"""
-        values = [c.value for c in cards]
-        unique_values = sorted(set(values))
-        
-        # Check for 4-card straight draws
-        for i in range(len(unique_values) - 3):
-            if unique_values[i+3] - unique_values[i] == 3:
-                return True
-        
-        # Check for gutshot draws (3 cards with 1 gap)
-        for i in range(len(unique_values) - 2):
-            if unique_values[i+2] - unique_values[i] == 4:
-                return True
-        
-        return False
+        # the rank bit is already sitting in the top of each cactus kev int
+        rank_bits = 0
+        for c in cards:
+            rank_bits |= c.ck >> 16
+        return STRAIGHT_DRAWS[rank_bits]
@@ -1,87 +1,99 @@
+import numpy as np
+from functools import lru_cache
 from typing import List
-from .card import Card
+from .card import Card, CARDS_BY_INDEX, cards_to_mask, mask_to_cards
 from .evaluator import HandEvaluator
-from .equity import EquityCalculator
+from .equity import _expand_range
+
+# strategic buckets for partition_range, and which detailed hand category lands in which
+STRATEGIC_CATEGORIES = ("value", "marginal", "flush_draw", "straight_draw", "bluff_air")
+CATEGORY_TO_BUCKET = {
+    "NUT_MADE_HAND": 0, "SET": 0, "TRIPS": 0, "TWO_PAIR": 0, "OVERPAIR": 0,
+    "TOP_PAIR": 1, "MID_WEAK_PAIR": 1,
+    "FLUSH_DRAW": 2,
+    "STRAIGHT_DRAW": 3,
+}
+BLUFF_AIR_BUCKET = 4  # NO_MADE_HAND_OR_DRAW, etc.
+
+# Define what a 'tight' player continues with. You can add more profiles.
+TIGHT_CONTINUE_CATEGORIES = frozenset({
+    "NUT_MADE_HAND", "SET", "TRIPS", "TWO_PAIR", "OVERPAIR", "TOP_PAIR",
+    "FLUSH_DRAW", "STRAIGHT_DRAW"  # A tight player still chases good draws
+})
+
+# built once and shared by every call (the evaluator keeps no per-call state)
+_hand_evaluator = HandEvaluator()
 
 def filter_range_for_board(preflop_range: List[str], board: List[Card], player_profile='tight') -> List[str]:
     """
     Filters a preflop range down to a likely postflop range based on board texture.
     """
-    hand_evaluator = HandEvaluator()
-    equity_calculator = EquityCalculator()
+    # the answer only depends on the range and which cards are on the board (every
+    # profile plays like 'tight' for now, so it stays out of the key), so repeat
+    # requests come straight out of the cache
+    return list(_filter_range_cached(tuple(preflop_range), cards_to_mask(board)))
 
-    # Define what a 'tight' player continues with. You can add more profiles.
-    tight_continue_categories = {
-        "NUT_MADE_HAND", "SET", "TRIPS", "TWO_PAIR", "OVERPAIR", "TOP_PAIR",
-        "FLUSH_DRAW", "STRAIGHT_DRAW"  # A tight player still chases good draws
-    }
-    
+@lru_cache(maxsize=1024)
+def _filter_range_cached(preflop_range: tuple, board_mask: int) -> tuple:
+    """filter_range_for_board keyed by range tuple + board mask"""
+    board = mask_to_cards(board_mask)
     postflop_range = []
 
+    kept = set()
     for hand_notation in preflop_range:
-        # Generate the specific card combos for this notation (e.g., AA -> AsAh, AsAc...)
-        hand_combos = equity_calculator._generate_all_combinations(hand_notation)
+        # the specific card combos for this notation (e.g., AA -> AsAh, AsAc...) as
+        # cached index arrays, with the ones that hit the board already dropped
+        firsts, seconds, masks = _expand_range((hand_notation,))
+        live = (masks & np.uint64(board_mask)) == 0
 
-        for combo in hand_combos:
-            if equity_calculator._cards_conflict(combo, board):
-                continue
+        for first, second in zip(firsts[live].tolist(), seconds[live].tolist()):
+            combo = [CARDS_BY_INDEX[first], CARDS_BY_INDEX[second]]
             
             # Get the detailed category for this specific hand on this board
-            category = hand_evaluator.get_hand_category(combo, board)
+            category = _hand_evaluator.get_hand_category(combo, board, board_mask)
 
             # The CORE LOGIC: Check if the category is one we expect to continue
-            if category in tight_continue_categories:
+            if category in TIGHT_CONTINUE_CATEGORIES:
                 # If it's a hand they'd play, we keep its notation in the new range
-                if hand_notation not in postflop_range:
+                if hand_notation not in kept:
+                    kept.add(hand_notation)
                     postflop_range.append(hand_notation)
                 break  # Move to the next hand notation (e.g., from AA to KK)
 
-    return postflop_range
+    return tuple(postflop_range)
 
 def partition_range(villain_range: List[str], board: List[Card]) -> dict:
     """
     Partitions a villain's range into strategic categories based on board texture.
     """
-    hand_evaluator = HandEvaluator()
-    equity_calculator = EquityCalculator()
-    
-    categories = {
-        "value": 0, 
-        "marginal": 0, 
-        "flush_draw": 0, 
-        "straight_draw": 0, 
-        "bluff_air": 0
-    }
-    total_combos = 0
+    # same range + same board cards = same partition, so repeats come from the cache
+    percentages = _partition_range_cached(tuple(villain_range), cards_to_mask(board))
+    return dict(zip(STRATEGIC_CATEGORIES, percentages))
 
-    for hand_notation in villain_range:
-        # Generate all possible combinations for this hand type
-        hand_combos = equity_calculator._generate_all_combinations(hand_notation)
-        
-        for combo in hand_combos:
-            # Skip combos that conflict with the board
-            if equity_calculator._cards_conflict(combo, board):
-                continue
+@lru_cache(maxsize=1024)
+def _partition_range_cached(villain_range: tuple, board_mask: int) -> tuple:
+    """partition_range keyed by range tuple + board mask, percentages in STRATEGIC_CATEGORIES order"""
+    board = mask_to_cards(board_mask)
 
-            # Get the detailed category for this specific hand on this board
-            category = hand_evaluator.get_hand_category(combo, board)
-            
-            # Map detailed categories to strategic categories
-            if category in ["NUT_MADE_HAND", "SET", "TRIPS", "TWO_PAIR", "OVERPAIR"]:
-                categories["value"] += 1
-            elif category in ["TOP_PAIR", "MID_WEAK_PAIR"]:
-                categories["marginal"] += 1
-            elif category == "FLUSH_DRAW":
-                categories["flush_draw"] += 1
-            elif category == "STRAIGHT_DRAW":
-                categories["straight_draw"] += 1
-            else:  # NO_MADE_HAND_OR_DRAW, etc.
-                categories["bluff_air"] += 1
-            
-            total_combos += 1
+    # every combo in the range as cached card index/mask arrays (no Card objects
+    # built per call), with combos that conflict with the board dropped in one AND
+    firsts, seconds, masks = _expand_range(villain_range)
+    live = (masks & np.uint64(board_mask)) == 0
 
-    # Convert counts to percentages
-    for category in categories:
-        categories[category] = round((categories[category] / total_combos) * 100, 2) if total_combos > 0 else 0
+    # category -> bucket id for every live combo, straight into an int array
+    # (dict.get as the lookup, no list of ids built in between)
+    live_firsts = firsts[live].tolist()
+    live_seconds = seconds[live].tolist()
+    categorize = _hand_evaluator.get_hand_category
+    bucket_of = CATEGORY_TO_BUCKET.get
+    bucket_ids = np.fromiter(
+        (bucket_of(categorize([CARDS_BY_INDEX[first], CARDS_BY_INDEX[second]], board, board_mask), BLUFF_AIR_BUCKET)
+         for first, second in zip(live_firsts, live_seconds)),
+        dtype=np.intp, count=len(live_firsts))
 
-    return categories
+    # count every bucket in one go
+    counts = np.bincount(bucket_ids, minlength=len(STRATEGIC_CATEGORIES)).tolist()
+    total_combos = sum(counts)
+
+    # Convert counts to percentages
+    return tuple(round((count / total_combos) * 100, 2) if total_combos > 0 else 0 for count in counts)
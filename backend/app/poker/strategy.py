@@ -1,5 +1,57 @@
+from bisect import bisect_right
 from typing import List
-from .card import Card
+from .card import Card, CARDS_BY_INDEX
+
+def _build_hand_notations():
+    """the AKs/72o notation for every (first card, second card), flat by index1 * 52 + index2,
+    with one shared string per notation"""
+    pool = {}
+    notations = []
+    for card1 in CARDS_BY_INDEX:
+        for card2 in CARDS_BY_INDEX:
+            # higher card first, then s/o unless it's a pair
+            high, low = (card1, card2) if card1.value >= card2.value else (card2, card1)
+            suffix = '' if card1.value == card2.value else ('s' if card1.suit == card2.suit else 'o')
+            hand = f"{high.rank}{low.rank}{suffix}"
+            notations.append(pool.setdefault(hand, hand))
+    return tuple(notations)
+
+HAND_NOTATIONS = _build_hand_notations()
+
+def hand_notation(card1: Card, card2: Card) -> str:
+    """Two cards in AKs or 72o format"""
+    return HAND_NOTATIONS[card1.index * len(CARDS_BY_INDEX) + card2.index]
+
+# generic chart action -> what it means from each seat
+POSITION_ACTION_MAP = {
+    'SB': {  # small blind can fold, call (limp), or raise
+        'FOLD': 'FOLD',
+        'CALL': 'CALL',  # limp in
+        'RAISE': 'RAISE'  # open raise
+    },
+    'BB': {  # big blind can fold, call, or reraise
+        'FOLD': 'FOLD',
+        'CALL': 'CALL',   # call the sb raise/limp
+        'RAISE': 'RERAISE'  # 3-bet the sb
+    }
+}
+
+# postflop: hand strength cutoffs per seat (weak below the first, medium below the
+# second, strong from there up) and the action for each bucket as
+# (bad pot odds, good pot odds). anything that isn't SB plays like BB
+POSTFLOP_CUTOFFS = {
+    'SB': (50, 75),
+    'BB': (40, 70),
+}
+POSTFLOP_ACTIONS = {
+    # sb acts first postflop: bet strong hands, check everything else
+    # (medium hands can check-call or check-raise, weak ones check-fold usually)
+    'SB': (('CHECK', 'CHECK'), ('CHECK', 'CHECK'), ('BET', 'BET')),
+    # bb acts second postflop (if sb checks): value bet strong hands, call medium
+    # ones with good pot odds, check back or fold to bet with weak ones
+    'BB': (('CHECK', 'CHECK'), ('CHECK', 'CALL'), ('BET', 'BET')),
+}
+GOOD_POT_ODDS = 0.3
 
 # preflop strategy - tells you whether to raise, call, or fold preflop
 class PreflopStrategy:
@@ -64,6 +116,14 @@ class PreflopStrategy:
             }
         }
         
+        # the charts read straight off the two card indexes: one flat table per seat
+        # with a slot for every (first card, second card), so a lookup is no strings
+        self._actions_by_index = {
+            position: tuple(chart.get(hand_notation(card1, card2), 'FOLD')
+                            for card1 in CARDS_BY_INDEX for card2 in CARDS_BY_INDEX)
+            for position, chart in self.preflop_charts.items()
+        }
+        
         # thresholds for when to do stuff
         self.gto_thresholds = {
             'SB': {
@@ -83,42 +143,15 @@ class PreflopStrategy:
         if len(hole_cards) != 2:
             return 'FOLD'
         
-        # turn the cards into AKs or 72o format
+        actions = self._actions_by_index.get(position)
+        if actions is None:
+            return 'FOLD'
         card1, card2 = hole_cards
-        if card1.value == card2.value:
-            hand = f"{card1.rank}{card2.rank}"
-        elif card1.suit == card2.suit:
-            # suited hand - put the higher card first
-            if card1.value > card2.value:
-                hand = f"{card1.rank}{card2.rank}s"
-            else:
-                hand = f"{card2.rank}{card1.rank}s"
-        else:
-            # offsuit hand - higher card first
-            if card1.value > card2.value:
-                hand = f"{card1.rank}{card2.rank}o"
-            else:
-                hand = f"{card2.rank}{card1.rank}o"
-        
-        chart = self.preflop_charts.get(position, {})
-        return chart.get(hand, 'FOLD')
+        return actions[card1.index * len(CARDS_BY_INDEX) + card2.index]
     
     def get_position_specific_action(self, position: str, generic_action: str) -> str:
         """Convert generic action to position-specific action"""
-        action_mapping = {
-            'SB': {  # small blind can fold, call (limp), or raise
-                'FOLD': 'FOLD',
-                'CALL': 'CALL',  # limp in
-                'RAISE': 'RAISE'  # open raise
-            },
-            'BB': {  # big blind can fold, call, or reraise
-                'FOLD': 'FOLD',
-                'CALL': 'CALL',   # call the sb raise/limp
-                'RAISE': 'RERAISE'  # 3-bet the sb
-            }
-        }
-        
-        mapping = action_mapping.get(position, action_mapping['SB'])
+        mapping = POSITION_ACTION_MAP.get(position, POSITION_ACTION_MAP['SB'])
         return mapping.get(generic_action, generic_action)
 
     def get_dynamic_preflop_action(self, position: str, hole_cards: List[Card], hand_percentile: float) -> str:
@@ -150,24 +183,8 @@ class PreflopStrategy:
 
     def get_postflop_action(self, position: str, hand_strength: float, pot_odds: float) -> str:
         """Get postflop recommendation based on position, hand strength, and pot odds"""
-        
-        # different positions act differently postflop
-        if position == "SB":
-            # sb acts first postflop
-            if hand_strength >= 75:  # really strong hand
-                return "BET"
-            elif hand_strength >= 50:  # medium strength
-                return "CHECK"  # can check-call or check-raise
-            else:  # weak hand
-                return "CHECK"  # check-fold usually
-        else:  # BB
-            # bb acts second postflop (if sb checks)
-            if hand_strength >= 70:  # strong hand
-                return "BET"  # value bet
-            elif hand_strength >= 40:  # medium strength
-                if pot_odds <= 0.3:  # good pot odds
-                    return "CALL"
-                else:
-                    return "CHECK"
-            else:  # weak hand
-                return "CHECK"  # check back or fold to bet
+        # different positions act differently postflop - bucket the strength
+        # against the seat's cutoffs and read the action straight off the table
+        seat = position if position in POSTFLOP_ACTIONS else 'BB'
+        bucket = bisect_right(POSTFLOP_CUTOFFS[seat], hand_strength)
+        return POSTFLOP_ACTIONS[seat][bucket][pot_odds <= GOOD_POT_ODDS]
@@ -16,6 +16,7 @@ else
     source venv/bin/activate
 fi
 
-# Start the server
+# Start the server (optimized, no debug reloader - run "python -m app.main" by
+# hand for development)
 echo "Starting server on http://localhost:5001..."
-python -m app.main
+ELARA_DEBUG=0 python -O -m app.main